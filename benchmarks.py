@@ -0,0 +1,417 @@
+#python 3
+
+"""
+	Benchmarks
+
+	startup	- time to import each module and to print console entry point help,
+			  measured in fresh interpreter processes
+	suite	- time and peak memory of the public scoring functions on synthetic
+			  news-like corpora over a grid of corpus sizes (documents x sentences
+			  per document), saved as json and compared against a baseline run
+	tokenizers	- agreement of every tokenizer backend with the nltk backend and
+			  throughput of each, on the tokenizer test passages plus synthetic
+			  documents, or on a data set with --path
+	char_similarity	- agreement and speedup of the ngram char_mode of similarity_measures
+			  against difflib on title and sentence pairs, with a refit of its calibration
+
+	usage:
+		python benchmarks.py startup [--repeats 5] [--output startup.json]
+		python benchmarks.py suite [--documents 10 50] [--sentences 10 40] [--output results.json] [--baseline old.json]
+		python benchmarks.py tokenizers [--path data_set/ --subreddit worldnews] [--output tokenizers.json]
+		python benchmarks.py char_similarity [--path data_set/ --subreddit worldnews] [--output char_similarity.json]
+"""
+
+#internal
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+import subprocess
+import tracemalloc
+import itertools
+from collections import Counter
+
+#mylibs
+import keywords as key
+import rake_sentence_ranking as rake
+import normalizers as norm
+import similarity_measures as sim
+from document_frequency import DocumentFrequencyIndex
+from tfidf_matrix import TfIdfMatrix
+import tokenizers
+import load_documents
+
+#
+#	Startup Benchmark
+#
+
+startup_modules = ['keywords', 'rake_sentence_ranking', 'normalizers', 'similarity_measures', 'summary', 'reduce_text', 'score_algorithm', 'reddit_scraper']
+startup_commands = {
+	'summarize --help': 'import reduce_text; reduce_text.main(["--help"])',
+	'score --help': 'import score_algorithm; score_algorithm.main(["--help"])',
+	'scrape --help': 'import reddit_scraper; reddit_scraper.main(["--help"])'
+}
+
+def time_python(code, repeats=5):
+	""" returns list of wall clock seconds to run code in a fresh interpreter, repeats times.
+	raises RuntimeError with the child's stderr when code fails, a crash is not a fast start """
+	cwd = os.path.dirname(os.path.abspath(__file__))
+	times = []
+	for _ in range(repeats):
+		start = time.perf_counter()
+		try:
+			subprocess.run([sys.executable, '-c', code], cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+		except subprocess.CalledProcessError as e:
+			raise RuntimeError('%r exited with status %d:\n%s' % (code, e.returncode, e.stderr.decode('utf-8', 'replace'))) from e
+		times.append(time.perf_counter() - start)
+	return times
+
+def startup_benchmark(repeats=5):
+	""" returns dictionary name -> {'median', 'min', 'over_interpreter'} seconds for importing each module and running each entry point help """
+	interpreter = statistics.median(time_python('pass', repeats))
+
+	cases = {'import ' + m: 'import ' + m for m in startup_modules}
+	cases.update(startup_commands)
+
+	results = {'interpreter': {'median': interpreter, 'min': interpreter, 'over_interpreter': 0.0}}
+	for name, code in cases.items():
+		times = time_python(code, repeats)
+		median = statistics.median(times)
+		results[name] = {'median': median, 'min': min(times), 'over_interpreter': median - interpreter}
+	return results
+
+#
+#	Synthetic Corpus
+#
+
+function_words = ['the', 'of', 'and', 'to', 'in', 'a', 'is', 'that', 'for', 'on', 'with', 'was', 'as', 'by', 'at', 'from', 'it', 'has', 'have', 'will', 'which', 'their', 'after', 'over']
+syllables = ['ka', 'ri', 'mo', 'sen', 'tal', 'vor', 'lin', 'dra', 'pe', 'gus', 'ter', 'on', 'bel', 'ma', 'shi', 'ro', 'zan', 'qui', 'ent', 'ust']
+
+def synthetic_vocabulary(size, seed=0):
+	""" returns list of size pseudo words of two to four syllables """
+	rng = random.Random(seed)
+	vocabulary = set()
+	while len(vocabulary) < size:
+		vocabulary.add(''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+	return sorted(vocabulary)
+
+def synthetic_sentence(rng, vocabulary, weights, names):
+	""" returns news-like sentence of content words drawn from a zipf distribution, function words, names, numbers and punctuation """
+	words = []
+	for _ in range(rng.randint(8, 30)):
+		r = rng.random()
+		if r < 0.40:
+			words.append(rng.choice(function_words))
+		elif r < 0.47:
+			words.append(rng.choice(names))
+		elif r < 0.49:
+			words.append(str(rng.randint(2, 2020)))
+		else:
+			words.append(rng.choices(vocabulary, weights)[0])
+		if rng.random() < 0.05:
+			words[-1] += ','
+	words[0] = words[0].capitalize()
+	return ' '.join(words) + rng.choice(['.', '.', '.', '?', '!'])
+
+def synthetic_corpus(num_documents, num_sentences, vocabulary_size=5000, seed=0):
+	""" returns list of {'title', 'text'} documents with num_sentences sentences each, deterministic for seed """
+	rng = random.Random(seed)
+	vocabulary = synthetic_vocabulary(vocabulary_size, seed)
+	weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+	names = [w.capitalize() for w in synthetic_vocabulary(200, seed + 1)]
+
+	documents = []
+	for _ in range(num_documents):
+		sentences = [synthetic_sentence(rng, vocabulary, weights, names) for _ in range(num_sentences)]
+		paragraphs = [' '.join(sentences[i:i+4]) for i in range(0, len(sentences), 4)]
+		title = synthetic_sentence(rng, vocabulary, weights, names)[:-1]
+		documents.append({'title': title, 'text': '\n\n'.join(paragraphs)})
+	return documents
+
+def prepare_corpus(documents):
+	""" adds token lists used by the similarity and tf-idf cases, preparation is not timed """
+	for d in documents:
+		d['title_tokens'] = norm.processes_and_tokenize(d['title'])
+		d['tokens'] = norm.processes_and_tokenize(d['text'])
+	return documents
+
+#
+#	Suite Cases, each case runs over the whole corpus
+#
+
+def case_top_sentences(corpus):
+	for d in corpus:
+		key.top_sentences(d['text'])
+
+def case_rake_extract(corpus):
+	for d in corpus:
+		rake.extract(d['text'])
+
+def case_rake_rank_sentences(corpus):
+	for d in corpus:
+		rake.rank_sentences(d['text'])
+
+def case_similarity_score(corpus):
+	for d in corpus:
+		sim.similarity_score(d['title_tokens'], d['tokens'])
+
+def case_tf_idf(corpus):
+	""" per term tf_idf for every unique term of the first document against the corpus token lists """
+	tokenized_documents_list = [d['tokens'] for d in corpus]
+	d = tokenized_documents_list[0]
+	for t in set(d):
+		norm.tf_idf(t, d, tokenized_documents_list)
+
+def case_document_frequency_index(corpus):
+	tokenized_documents_list = [d['tokens'] for d in corpus]
+	index = DocumentFrequencyIndex(tokenized_documents_list)
+	for d in tokenized_documents_list:
+		for t in set(d):
+			index.nolog_inverse_document_frequency(t)
+
+def case_tf_idf_matrix(corpus):
+	TfIdfMatrix([d['tokens'] for d in corpus]).ranked_keywords(n=10)
+
+suite_cases = {
+	'keywords.top_sentences': case_top_sentences,
+	'rake_sentence_ranking.extract': case_rake_extract,
+	'rake_sentence_ranking.rank_sentences': case_rake_rank_sentences,
+	'similarity_measures.similarity_score': case_similarity_score,
+	'normalizers.tf_idf': case_tf_idf,
+	'document_frequency.DocumentFrequencyIndex': case_document_frequency_index,
+	'tfidf_matrix.TfIdfMatrix': case_tf_idf_matrix
+}
+
+def time_case(case, corpus, repeats=3):
+	""" returns minimum wall clock seconds of repeats runs """
+	times = []
+	for _ in range(repeats):
+		start = time.perf_counter()
+		case(corpus)
+		times.append(time.perf_counter() - start)
+	return min(times)
+
+def peak_memory(case, corpus):
+	""" returns peak bytes allocated by python during one run, measured separately since tracemalloc slows the run down """
+	tracemalloc.start()
+	try:
+		case(corpus)
+		return tracemalloc.get_traced_memory()[1]
+	finally:
+		tracemalloc.stop()
+
+def run_suite(documents_grid=(10, 50), sentences_grid=(10, 40), cases=None, repeats=3, memory=True, seed=0):
+	""" returns {'meta', 'results'}, one result per case per (documents, sentences) grid point """
+	if cases is None:
+		cases = list(suite_cases)
+
+	results = []
+	for num_documents in documents_grid:
+		for num_sentences in sentences_grid:
+			corpus = prepare_corpus(synthetic_corpus(num_documents, num_sentences, seed=seed))
+			num_tokens = sum(len(d['text'].split()) for d in corpus)
+
+			for name in cases:
+				case = suite_cases[name]
+				case(corpus)	# warm caches and lazy imports
+				seconds = time_case(case, corpus, repeats)
+				result = {
+					'case': name,
+					'documents': num_documents,
+					'sentences': num_sentences,
+					'tokens': num_tokens,
+					'seconds': seconds,
+					'seconds_per_1k_tokens': 1000 * seconds / num_tokens,
+					'peak_bytes': peak_memory(case, corpus) if memory else None
+				}
+				results.append(result)
+				print ("%-45s docs: %5d  sentences: %5d  seconds: %10.4f" % (name, num_documents, num_sentences, seconds))
+
+	meta = {
+		'python': platform.python_version(),
+		'platform': platform.platform(),
+		'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+		'repeats': repeats,
+		'seed': seed
+	}
+	return {'meta': meta, 'results': results}
+
+def compare(results, baseline, threshold=0.2):
+	""" returns list of (case, documents, sentences, baseline seconds, seconds, ratio) for grid points slower than baseline by more than threshold """
+	baseline_seconds = {(r['case'], r['documents'], r['sentences']): r['seconds'] for r in baseline['results']}
+
+	regressions = []
+	for r in results['results']:
+		old_seconds = baseline_seconds.get((r['case'], r['documents'], r['sentences']))
+		if old_seconds is None or old_seconds == 0:
+			continue
+		ratio = r['seconds'] / old_seconds
+		if ratio > 1 + threshold:
+			regressions.append((r['case'], r['documents'], r['sentences'], old_seconds, r['seconds'], ratio))
+	return regressions
+
+#
+#	Tokenizer Agreement and Throughput
+#
+
+tokenizer_passages = [
+	'The U.S. and the U.K. said on Monday that Mr. Smith, 54, would not run again. He didn\'t say why.',
+	'"We can\'t accept this," the minister told reporters. "It\'s a question of trust."',
+	'Prices rose 3.5% to $1,200 in Jan. after a 10:30 a.m. announcement -- the highest since 2008.',
+	'AT&T (the company) cannot confirm the deal... Officials declined to comment!',
+	'Is this the end? Analysts say no; others aren\'t so sure: "wait and see."',
+	'Dr. O\'Neil\'s well-known report, published by Reuters Inc. in Washington, D.C., was cited.',
+	'Gen. Mark Milley\'s comments came after the U.N. vote, which passed 128-9 with 35 abstentions.',
+	'They\'re gonna need more time, she\'d said, and we\'ll see what they\'ve got.'
+]
+
+def tokenizer_corpus(path=None, subreddit='worldnews', num_documents=50, seed=0):
+	""" returns list of texts, data set documents when path is given, otherwise the test passages and synthetic documents """
+	if path is not None:
+		return list(itertools.islice(load_documents.iter_documents(path, subreddit, fields='text'), num_documents))
+	return tokenizer_passages + [d['text'] for d in synthetic_corpus(num_documents, 20, seed=seed)]
+
+def tokenizer_agreement(texts, backend, reference='nltk'):
+	""" returns dictionary of agreement rates of backend with reference backend.
+
+	sentence_agreement	- fraction of texts split into identical sentences
+	word_agreement		- fraction of reference sentences tokenized into identical word lists
+	token_agreement		- matching tokens over tokens, per reference sentence, summed over the corpus """
+	tokenizer = tokenizers.get(backend)
+	reference = tokenizers.get(reference)
+
+	same_sentences = same_words = num_sentences = 0
+	matching_tokens = num_tokens = 0
+	for text in texts:
+		reference_sentences = reference.sentences(text)
+		same_sentences += tokenizer.sentences(text) == reference_sentences
+		for sentence in reference_sentences:
+			expected = reference.words(sentence)
+			words = tokenizer.words(sentence)
+			num_sentences += 1
+			same_words += words == expected
+			matching_tokens += sum((Counter(words) & Counter(expected)).values())
+			num_tokens += max(len(words), len(expected))
+
+	return {
+		'sentence_agreement': same_sentences / max(len(texts), 1),
+		'word_agreement': same_words / max(num_sentences, 1),
+		'token_agreement': matching_tokens / max(num_tokens, 1)
+	}
+
+def tokenizer_throughput(texts, backend, repeats=3):
+	""" returns dictionary of best seconds over repeats and tokens per second for sentence splitting plus word tokenization of texts """
+	tokenizer = tokenizers.get(backend)
+
+	def run():
+		return sum(len(tokenizer.words(s)) for text in texts for s in tokenizer.sentences(text))
+
+	num_tokens = run()	# warm up, loads nltk models
+	seconds = min(time_case(lambda texts: run(), texts, 1) for _ in range(repeats))
+	return {'seconds': seconds, 'tokens': num_tokens, 'tokens_per_second': num_tokens / seconds if seconds > 0 else 0.0}
+
+def tokenizer_benchmark(texts, repeats=3, reference='nltk'):
+	""" returns dictionary backend -> throughput and agreement with reference backend """
+	results = {}
+	for backend in sorted(tokenizers.backends):
+		result = tokenizer_throughput(texts, backend, repeats)
+		result.update(tokenizer_agreement(texts, backend, reference))
+		results[backend] = result
+	return results
+
+#
+#	Character Similarity Agreement
+#
+
+def char_similarity_pairs(path=None, subreddit='worldnews', num_documents=50, num_sentences=5, seed=0):
+	""" returns list of (title tokens, sentence tokens) of the first num_sentences sentences of each document,
+	data set documents when path is given, otherwise synthetic documents plus every pair of tokenizer test passages """
+	if path is not None:
+		documents = list(itertools.islice(load_documents.iter_documents(path, subreddit, fields=('title', 'text')), num_documents))
+	else:
+		documents = synthetic_corpus(num_documents, 2 * num_sentences, seed=seed)
+
+	pairs = []
+	for d in documents:
+		title_tokens = norm.processes_and_tokenize(d['title'])
+		for sentence in key.extract_sentences(d['text'])[:num_sentences]:
+			pairs.append((title_tokens, norm.processes_and_tokenize(sentence)))
+
+	if path is None:
+		passages = [norm.processes_and_tokenize(p) for p in tokenizer_passages]
+		pairs.extend(itertools.combinations(passages, 2))
+	return pairs
+
+def char_similarity_benchmark(pairs, n=3):
+	""" returns sim.compare_char_similarity_modes of pairs with the current calibration and a least squares refit on pairs """
+	result = sim.compare_char_similarity_modes(pairs, n)
+	result['ngram_scale'], result['ngram_background'] = sim.ngram_scale, sim.ngram_background
+	result['fitted_scale'], result['fitted_background'] = sim.calibrate_ngram_similarity(pairs, n)
+	return result
+
+#
+#	Output
+#
+
+def print_table(results):
+	print ("%-32s %10s %10s %16s" % ('case', 'median s', 'min s', 'over python s'))
+	for name, result in results.items():
+		print ("%-32s %10.4f %10.4f %16.4f" % (name, result['median'], result['min'], result['over_interpreter']))
+
+def print_tokenizer_table(results):
+	print ("%-10s %12s %16s %10s %10s %10s" % ('backend', 'seconds', 'tokens/s', 'sentences', 'words', 'tokens'))
+	for name, result in results.items():
+		print ("%-10s %12.4f %16.0f %10.3f %10.3f %10.3f" % (name, result['seconds'], result['tokens_per_second'], result['sentence_agreement'], result['word_agreement'], result['token_agreement']))
+
+def print_char_similarity_table(result):
+	print ("%d pairs, exact %.4fs, ngram %.4fs, speedup x%.1f" % (result['pairs'], result['exact_seconds'], result['ngram_seconds'], result['speedup']))
+	print ("mean exact %.3f, mean ngram %.3f" % (result['mean_exact'], result['mean_ngram']))
+	print ("mean absolute error %.3f, mean relative error %.3f, correlation %.3f" % (result['mean_absolute_error'], result['mean_relative_error'], result['correlation']))
+	print ("calibration scale %.3f background %.3f, refit on these pairs scale %.3f background %.3f" % (result['ngram_scale'], result['ngram_background'], result['fitted_scale'], result['fitted_background']))
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='project benchmarks')
+	parser.add_argument('benchmark', choices=['startup', 'suite', 'tokenizers', 'char_similarity'])
+	parser.add_argument('--repeats', type=int, default=None, help='runs per measurement, 5 for startup, 3 for suite')
+	parser.add_argument('--output', default=None, help='write results as json')
+	parser.add_argument('--documents', type=int, nargs='+', default=[10, 50], help='suite: documents per corpus')
+	parser.add_argument('--sentences', type=int, nargs='+', default=[10, 40], help='suite: sentences per document')
+	parser.add_argument('--cases', nargs='+', default=None, choices=list(suite_cases), help='suite: cases to run, default all')
+	parser.add_argument('--no-memory', action='store_true', help='suite: skip peak memory measurement')
+	parser.add_argument('--baseline', default=None, help='suite: json results to compare against')
+	parser.add_argument('--threshold', type=float, default=0.2, help='suite: slowdown ratio reported as regression')
+	parser.add_argument('--path', default=None, help='tokenizers, char_similarity: data set directory, default test passages and synthetic documents')
+	parser.add_argument('--subreddit', default='worldnews', help='tokenizers, char_similarity: data set subreddit')
+	args = parser.parse_args(argv)
+
+	if args.benchmark == 'startup':
+		results = startup_benchmark(args.repeats or 5)
+		print_table(results)
+	elif args.benchmark == 'tokenizers':
+		results = tokenizer_benchmark(tokenizer_corpus(args.path, args.subreddit), args.repeats or 3)
+		print_tokenizer_table(results)
+	elif args.benchmark == 'char_similarity':
+		results = char_similarity_benchmark(char_similarity_pairs(args.path, args.subreddit))
+		print_char_similarity_table(results)
+	else:
+		results = run_suite(args.documents, args.sentences, args.cases, args.repeats or 3, not args.no_memory)
+
+		if args.baseline is not None:
+			with open(args.baseline) as data_file:
+				baseline = json.load(data_file)
+			regressions = compare(results, baseline, args.threshold)
+			for case, num_documents, num_sentences, old_seconds, seconds, ratio in regressions:
+				print ("REGRESSION %-45s docs: %5d  sentences: %5d  %.4fs -> %.4fs (x%.2f)" % (case, num_documents, num_sentences, old_seconds, seconds, ratio))
+			if len(regressions) == 0:
+				print ("no regressions against %s" % args.baseline)
+
+	if args.output is not None:
+		with open(args.output, 'w+') as outfile:
+			json.dump(results, outfile, indent=2)
+
+if __name__ == '__main__':
+	main()
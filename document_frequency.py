@@ -0,0 +1,114 @@
+#python 3
+
+"""
+	Corpus document frequency index
+
+	counts the number of documents containing each term, built once over the
+	tokenized corpus and updated as new documents are added. IDF lookups are
+	a dictionary access instead of a scan over every document.
+"""
+
+#internal
+import math
+import json
+import logging
+from collections import Counter
+
+# logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class DocumentFrequencyIndex:
+	""" term -> number of documents containing term """
+
+	def __init__(self, tokenized_documents_list=None):
+		self.document_frequency = Counter()
+		self.num_documents = 0
+		self.document_ids = set()
+
+		if tokenized_documents_list is not None:
+			self.add_documents(tokenized_documents_list)
+
+	def __len__(self):
+		return self.num_documents
+
+	def __contains__(self, term):
+		return term in self.document_frequency
+
+	def add_document(self, tokenized_document, document_id=None):
+		""" Count terms of document once, documents with an already indexed id are skipped. Returns True if added """
+		if document_id is not None:
+			if document_id in self.document_ids:
+				return False
+			self.document_ids.add(document_id)
+
+		self.document_frequency.update(set(tokenized_document))
+		self.num_documents += 1
+		return True
+
+	def add_documents(self, tokenized_documents_list, document_ids=None):
+		""" Add list of tokenized documents, returns number of documents added """
+		if document_ids is None:
+			document_ids = [None] * len(tokenized_documents_list)
+
+		added = 0
+		for tokenized_document, document_id in zip(tokenized_documents_list, document_ids):
+			added += self.add_document(tokenized_document, document_id)
+		return added
+
+	def remove_document(self, tokenized_document, document_id):
+		""" Remove counts of document previously added with document_id, used before re-adding an updated document.
+		raises KeyError for an id that was never added, documents added without an id can not be removed """
+		if document_id not in self.document_ids:
+			raise KeyError(document_id)
+		self.document_ids.remove(document_id)
+
+		for term in set(tokenized_document):
+			self.document_frequency[term] -= 1
+			if self.document_frequency[term] <= 0:
+				del self.document_frequency[term]
+		self.num_documents -= 1
+
+	def frequency(self, term):
+		""" Return number of documents containing term """
+		return self.document_frequency[term]
+
+	def inverse_document_frequency(self, term):
+		""" IDF(t) = ln( Number Of Documents / Number Of Documents Containg Term )."""
+		num_documents_with_term = self.document_frequency[term]
+
+		assert num_documents_with_term > 0
+		return math.log(self.num_documents / num_documents_with_term)
+
+	def nolog_inverse_document_frequency(self, term):
+		""" IDF(t) = Number Of Documents / Number Of Documents Containg Term """
+		num_documents_with_term = self.document_frequency[term]
+
+		assert num_documents_with_term > 0
+		return self.num_documents / num_documents_with_term
+
+	def save(self, path):
+		""" Write index to json file """
+		logger.info('Saving Document Frequency Index: %s' % path)
+
+		data = {
+			'num_documents': self.num_documents,
+			'document_ids': sorted(self.document_ids),
+			'document_frequency': dict(self.document_frequency)
+		}
+		with open(path, 'w+') as outfile:
+			json.dump(data, outfile)
+
+	@classmethod
+	def load(cls, path):
+		""" Read index from json file """
+		logger.info('Loading Document Frequency Index: %s' % path)
+
+		with open(path) as data_file:
+			data = json.load(data_file)
+
+		index = cls()
+		index.num_documents = data['num_documents']
+		index.document_ids = set(data['document_ids'])
+		index.document_frequency = Counter(data['document_frequency'])
+		return index
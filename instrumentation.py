@@ -0,0 +1,182 @@
+#python 3
+
+"""
+	Per stage timing and counter instrumentation
+
+	stages are timed with
+
+		with instrumentation.stage('tokenize'):
+			...
+
+	and counters are bumped with instrumentation.count('tokens', n).
+	both do nothing until instrumentation is enabled, either with enable()
+	or by setting the environment variable NLP_INSTRUMENT=1. a disabled stage
+	costs one function call and a shared no-op context manager.
+
+	stage times are inclusive wall clock seconds, a stage timed inside another
+	stage is counted in both. stages used by the project:
+
+		tokenize	- sentence and word tokenization
+		stopword	- stop word, punctuation, short word and number filtering
+		stem		- porter stemming
+		phrase		- phrase building from break words
+		score		- word, phrase, sentence and tf-idf scoring
+		similarity	- similarity measures and wordnet similarity
+		pos			- part of speech tagging
+		io			- reading and writing data set files
+
+	profile() captures a cProfile of a whole run.
+"""
+
+#internal
+import io
+import os
+import sys
+import json
+import time
+import logging
+import pstats
+import cProfile
+import threading
+import contextlib
+from collections import Counter
+
+# logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+#
+#	Settings
+#
+
+enabled = os.environ.get('NLP_INSTRUMENT', '') not in ('', '0')
+
+_stages = {}			# stage -> [calls, seconds]
+_counters = Counter()	# counter -> count
+_lock = threading.Lock()
+
+def enable():
+	global enabled
+	enabled = True
+
+def disable():
+	global enabled
+	enabled = False
+
+def reset():
+	""" clear all stage times and counters """
+	with _lock:
+		_stages.clear()
+		_counters.clear()
+
+#
+#	Timing and Counting Methods
+#
+
+class _NullStage:
+	""" stage returned while instrumentation is disabled """
+	__slots__ = ()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		return False
+
+_null_stage = _NullStage()
+
+class _Stage:
+	__slots__ = ('name', 'start')
+
+	def __init__(self, name):
+		self.name = name
+
+	def __enter__(self):
+		self.start = time.perf_counter()
+		return self
+
+	def __exit__(self, *exc):
+		add_time(self.name, time.perf_counter() - self.start)
+		return False
+
+def stage(name):
+	""" Returns context manager timing its block under stage name, a no-op while disabled """
+	if not enabled:
+		return _null_stage
+	return _Stage(name)
+
+def add_time(name, seconds, calls=1):
+	""" Add seconds and calls to stage name """
+	with _lock:
+		totals = _stages.get(name)
+		if totals is None:
+			_stages[name] = [calls, seconds]
+		else:
+			totals[0] += calls
+			totals[1] += seconds
+
+def count(name, n=1):
+	""" Add n to counter name while enabled """
+	if enabled:
+		with _lock:
+			_counters[name] += n
+
+#
+#	Report Methods
+#
+
+def snapshot():
+	""" Returns {'stages': {stage: {'calls', 'seconds'}}, 'counters': {counter: count}} """
+	with _lock:
+		return {
+			'stages': {name: {'calls': calls, 'seconds': seconds} for name, (calls, seconds) in _stages.items()},
+			'counters': dict(_counters)
+		}
+
+def merge(other):
+	""" Add snapshot from another process into current totals """
+	for name, totals in other['stages'].items():
+		add_time(name, totals['seconds'], totals['calls'])
+	with _lock:
+		_counters.update(other['counters'])
+
+def summary_table():
+	""" Returns stage and counter totals as printable table, stages sorted by seconds """
+	report = snapshot()
+	lines = ["%-16s %10s %12s %14s" % ('stage', 'calls', 'seconds', 'mean ms')]
+	for name, totals in sorted(report['stages'].items(), key=lambda x: x[1]['seconds'], reverse=True):
+		lines.append("%-16s %10d %12.4f %14.4f" % (name, totals['calls'], totals['seconds'], 1000 * totals['seconds'] / totals['calls']))
+
+	if len(report['counters']) > 0:
+		lines.append('')
+		lines.append("%-16s %10s" % ('counter', 'count'))
+		for name, n in sorted(report['counters'].items()):
+			lines.append("%-16s %10d" % (name, n))
+	return '\n'.join(lines)
+
+def save(path):
+	""" Write snapshot to json file """
+	logger.info('Saving Instrumentation Report: %s' % path)
+	with open(path, 'w+') as outfile:
+		json.dump(snapshot(), outfile, indent=2)
+
+#
+#	Profiling
+#
+
+@contextlib.contextmanager
+def profile(path=None, sort='cumulative', limit=30):
+	""" cProfile the block, writes pstats file to path, otherwise prints the top limit functions by sort to stderr """
+	profiler = cProfile.Profile()
+	profiler.enable()
+	try:
+		yield profiler
+	finally:
+		profiler.disable()
+		if path is not None:
+			logger.info('Saving Profile: %s' % path)
+			profiler.dump_stats(path)
+		else:
+			stream = io.StringIO()
+			pstats.Stats(profiler, stream=stream).sort_stats(sort).print_stats(limit)
+			sys.stderr.write(stream.getvalue())
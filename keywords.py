@@ -20,29 +20,28 @@ import re
 import copy
 
 import similarity_measures as sim
+import lexicon
+import instrumentation as inst
+import text_cache
+import tokenizers
 
-#external
-import numpy as np
-import nltk
-from nltk.tokenize import RegexpTokenizer
-from nltk.stem.porter import *
-from nltk.corpus import stopwords
-from nltk.tag import pos_tag
-from nltk import FreqDist
+#external (imported on first use)
+from lazy_imports import lazy_module
+np = lazy_module('numpy')
+nltk = lazy_module('nltk')
 
 def remove_scores(list_of_tupples):
 	return [i[0] for i in list_of_tupples]
 
 def is_punctuation(word):
 	""" Return True if word is composed entirly of punctuation and whitespace """
-	if set(word) < set(string.punctuation + string.whitespace):
+	if set(word) < lexicon.PUNCTUATION_WHITESPACE:
 		return True
 	return False
 
-def is_stopword(word):
+def is_stopword(word, languages=lexicon.ALL_LANGUAGES):
 	""" Return True of word is in stop word list """
-	stop_words = nltk.corpus.stopwords.words()
-	return word in stop_words
+	return lexicon.is_stopword(word, languages)
 
 def break_word(word, marker):
 	""" Seperate phrases based on break_words, return marker if word is break_word, otherwise return word """
@@ -50,39 +49,51 @@ def break_word(word, marker):
 		return marker
 	return word
 
+# tokenizer backend name, None for tokenizers.default_backend
+tokenizer_backend = None
+
 def extract_sentences(document):
-	sentences = nltk.sent_tokenize(document.lower())
+	sentences = text_cache.sentences(document.lower(), tokenizer_backend)
 	return sentences
 
 def extract_words(sentence):
-	words = nltk.word_tokenize(sentence)
+	words = tokenizers.get(tokenizer_backend).words(sentence)
 	return words
 
-def extract_phrases(document):
-	""" Exctract non stop words and phrases from document and return list of words and phrases"""
+def phrases_from_words(sentence_words):
+	""" Build list of phrases from list of tokenized sentences, phrases are seperated by break words """
 	marker = '|'
-	sentences = extract_sentences(document)
 
 	phrase_list = []
-	for sentence in sentences:
-		sentence = extract_words(sentence)
-		phrase_list += [break_word(w,marker) for w in sentence]
+	for words in sentence_words:
+		phrase_list += [break_word(w,marker) for w in words]
 
 	phrase_list = ' '.join(phrase_list).split(marker)
 	return list([p.strip() for p in phrase_list if is_punctuation(p) == False])
 
-def compute_word_scores(phrase_list):
+def extract_phrases(document):
+	""" Exctract non stop words and phrases from document and return list of words and phrases"""
+	sentences, sentence_words = text_cache.tokenize(document.lower(), tokenizer=tokenizer_backend)
+	return phrases_from_words(sentence_words)
+
+def phrase_words(phrase_list):
+	""" Return list of word lists for phrase list, phrases are joined tokens so splitting recovers them """
+	return [phrase.split() for phrase in phrase_list]
+
+def compute_word_scores(phrase_list, phrase_word_lists=None):
 	""" Return dictionary of word scores. word_score = deg(w) / freq(w),
 	where freq(w) is the number of document occurences, 
 	and where deg(w) is the number of document occurences 
 	plus the combined word length of its member phrases"""
+	if phrase_word_lists is None:
+		phrase_word_lists = phrase_words(phrase_list)
 
-	tokens = extract_words(' '.join(phrase_list))
-	word_freq = FreqDist(tokens)
-	word_degree = FreqDist(tokens)
+	tokens = [word for words in phrase_word_lists for word in words]
+	word_freq = nltk.FreqDist(tokens)
+	word_degree = nltk.FreqDist(tokens)
 
-	for phrase in phrase_list:
-		for word in extract_words(phrase):
+	for phrase, words in zip(phrase_list, phrase_word_lists):
+		for word in words:
 			word_degree[word] += len(phrase)-1
 
 	word_scores = {}
@@ -91,13 +102,16 @@ def compute_word_scores(phrase_list):
 
 	return word_scores
 
-def compute_phrase_scores(phrase_list):
+def compute_phrase_scores(phrase_list, word_scores=None, phrase_word_lists=None):
 	""" Phrase score is equal to sum of word scores contained in phrase """
-	word_scores = compute_word_scores(phrase_list)
+	if phrase_word_lists is None:
+		phrase_word_lists = phrase_words(phrase_list)
+	if word_scores is None:
+		word_scores = compute_word_scores(phrase_list, phrase_word_lists)
 
 	phrase_scores = {p:0 for p in phrase_list}
-	for phrase in phrase_list:
-		for word in extract_words(phrase):
+	for phrase, words in zip(phrase_list, phrase_word_lists):
+		for word in words:
 			try: phrase_scores[phrase] += word_scores[word]
 			except: pass
 
@@ -105,85 +119,207 @@ def compute_phrase_scores(phrase_list):
 
 def compute_sentence_scores(document):
 	""" Sentence score is equal to sum of word and phrase scores contained in sentence """
+	return analyze(document).sentence_scores
 
-	word_list = extract_words(document)
-	phrase_list = extract_phrases(document)	
-	sentence_list = extract_sentences(document)
-
-	word_scores = compute_word_scores(phrase_list)
-	phrase_scores = compute_phrase_scores(phrase_list)
-
-	sentence_scores = {s:0 for s in sentence_list}
-	for sentence in sentence_list:
-		for word in extract_words(' '.join(phrase_list)):
-			sentence_scores[sentence] += word_scores[word]
+def build_occurrence_index(keys, sentence_ids):
+	""" Return dictionary key -> list of sentence ids, one entry per occurrence """
+	index = {}
+	for key, sentence_id in zip(keys, sentence_ids):
+		index.setdefault(key, []).append(sentence_id)
+	return index
 
-	for sentence in sentence_list:
-		for phrase in phrase_list:
-			if set(phrase) < set(sentence):
-				sentence_scores[sentence] += phrase_scores[phrase]
+#
+#	Document Analysis
+#
 
-	return sentence_scores
+class DocumentAnalysis:
+	""" Single parse of a document.
+
+	Sentences, words and phrases are extracted once on construction,
+	word, phrase and sentence scores are computed on first use and cached.
+	All top n queries and summary are answered from the same parse.
+
+	Phrases are built per sentence, so every phrase occurrence knows its
+	sentence id. Word -> sentence and phrase -> sentence occurrence maps
+	are built in one pass over the phrases, which keeps sentence scoring
+	linear in the number of tokens. """
+
+	def __init__(self, document, tokenizer=None):
+		self.document = document
+		with inst.stage('tokenize'):
+			self.sentences, self.sentence_words = text_cache.tokenize(document.lower(), tokenizer=tokenizer or tokenizer_backend)
+
+		with inst.stage('phrase'):
+			self.phrases = []
+			self.phrase_sentence_ids = []
+			for sentence_id, words in enumerate(self.sentence_words):
+				sentence_phrases = phrases_from_words([words])
+				self.phrases += sentence_phrases
+				self.phrase_sentence_ids += [sentence_id] * len(sentence_phrases)
+			self.phrase_words = phrase_words(self.phrases)
+
+		inst.count('documents')
+		inst.count('sentences', len(self.sentences))
+		inst.count('tokens', sum(len(words) for words in self.sentence_words))
+		inst.count('phrases', len(self.phrases))
+
+		self._word_index = None
+		self._phrase_index = None
+
+		self._word_scores = None
+		self._phrase_scores = None
+		self._sentence_score_list = None
+		self._sentence_scores = None
+
+	@property
+	def word_index(self):
+		""" word -> list of sentence ids, one entry per word occurrence """
+		if self._word_index is None:
+			word_sentence_ids = [i for words, i in zip(self.phrase_words, self.phrase_sentence_ids) for word in words]
+			words = [word for words in self.phrase_words for word in words]
+			self._word_index = build_occurrence_index(words, word_sentence_ids)
+		return self._word_index
+
+	@property
+	def phrase_index(self):
+		""" phrase -> list of sentence ids containing phrase """
+		if self._phrase_index is None:
+			phrase_index = build_occurrence_index(self.phrases, self.phrase_sentence_ids)
+			self._phrase_index = {p:sorted(set(ids)) for p, ids in phrase_index.items()}
+		return self._phrase_index
+
+	@property
+	def word_scores(self):
+		if self._word_scores is None:
+			with inst.stage('score'):
+				self._word_scores = compute_word_scores(self.phrases, self.phrase_words)
+		return self._word_scores
+
+	@property
+	def phrase_scores(self):
+		if self._phrase_scores is None:
+			word_scores = self.word_scores
+			with inst.stage('score'):
+				self._phrase_scores = compute_phrase_scores(self.phrases, word_scores, self.phrase_words)
+		return self._phrase_scores
+
+	@property
+	def sentence_score_list(self):
+		""" list of sentence scores, indexed by sentence position """
+		if self._sentence_score_list is None:
+			self._sentence_score_list = self._compute_sentence_scores()
+		return self._sentence_score_list
+
+	@property
+	def sentence_scores(self):
+		""" dictionary sentence -> score """
+		if self._sentence_scores is None:
+			self._sentence_scores = dict(zip(self.sentences, self.sentence_score_list))
+		return self._sentence_scores
+
+	def _compute_sentence_scores(self):
+		word_scores = self.word_scores
+		phrase_scores = self.phrase_scores
+
+		with inst.stage('score'):
+			scores = [0] * len(self.sentences)
+			for word, sentence_ids in self.word_index.items():
+				for i in sentence_ids:
+					scores[i] += word_scores[word]
+
+			for phrase, sentence_ids in self.phrase_index.items():
+				for i in sentence_ids:
+					scores[i] += phrase_scores[phrase]
+
+		return scores
+
+	def ranked_sentence_ids(self):
+		""" Return sentence positions sorted by descending score, ties keep document order """
+		scores = self.sentence_score_list
+		return sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+
+	def remove_redundant(self, sentence_ids, n, threshold=0.8):
+		""" Return first n sentence positions whose sentence is not similar (difflib ratio > threshold) to an already chosen one """
+		chosen_ids = []
+		for i in sentence_ids:
+			if len(chosen_ids) >= n:
+				break
+			if all(sim.similar(self.sentences[i], self.sentences[j]) <= threshold for j in chosen_ids):
+				chosen_ids.append(i)
+		return chosen_ids
+
+	def top_words(self, n=5, return_scores=True):
+		""" Return top n words after computing scores """
+		word_scores = self.word_scores
+
+		n = min(len(word_scores), n)
+		top_words = sorted(word_scores.items(), key=operator.itemgetter(1), reverse=True)[:n]
+
+		if return_scores == False:
+			return remove_scores(top_words)
+		return top_words
+
+	def top_phrases(self, n=5, return_scores=True):
+		""" Return top n phrases after computing scores """
+		phrase_scores = self.phrase_scores
+
+		n = min(len(self.phrases), n)
+		top_phrases = sorted(phrase_scores.items(), key=operator.itemgetter(1), reverse=True)[:n]
+
+		if return_scores == False:
+			return remove_scores(top_phrases)
+		return top_phrases
+
+	def top_sentences(self, n=2, return_scores=True, original_order=False, redundancy_threshold=None):
+		""" Return top n sentences after computing scores.
+		original_order returns chosen sentences in document order, leaving out sentences of min_length words or less.
+		redundancy_threshold optionally skips sentences similar to a higher scoring chosen sentence """
+		scores = self.sentence_score_list
+		ranked_ids = self.ranked_sentence_ids()
+
+		n = min(len(ranked_ids), n)
+		if redundancy_threshold is None:
+			top_ids = ranked_ids[:n]
+		else:
+			top_ids = self.remove_redundant(ranked_ids, n, redundancy_threshold)
+
+		#if original order is selected:
+		min_length = 3 # words
+		if original_order == True:
+			top_ids = [i for i in sorted(top_ids) if len(self.sentences[i].split(' ')) > min_length]
+
+		top_sentences = [(self.sentences[i], scores[i]) for i in top_ids]
+
+		if return_scores == False:
+			return remove_scores(top_sentences)
+		return top_sentences
+
+	def summary(self, percentage):
+		num_sentence_to_extract= int(percentage* len(self.sentences))
+		key_sentence_list = self.top_sentences(n=num_sentence_to_extract, return_scores=False, original_order=True)
+		reduced_summary = ' '.join(key_sentence_list)
+		return reduced_summary
+
+def analyze(document):
+	""" Return DocumentAnalysis for document, an existing DocumentAnalysis is returned as is """
+	if isinstance(document, DocumentAnalysis):
+		return document
+	return DocumentAnalysis(document)
 
 def top_words(document, n=5, return_scores=True):
-	""" Return top n phrases after computing scores """
-	phrase_list = extract_phrases(document)
-	word_scores = compute_word_scores(phrase_list)
-
-	n = min(len(word_scores), n)
-	top_words = sorted(word_scores.items(), key=operator.itemgetter(1), reverse=True)[:n]
-
-	if return_scores == False:
-		return remove_scores(top_words)
-	return top_words
-	
+	""" Return top n words after computing scores """
+	return analyze(document).top_words(n, return_scores)
 
 def top_phrases(document, n=5, return_scores=True):
 	""" Return top n phrases after computing scores """
-	phrase_list = extract_phrases(document)
-	phrase_scores = compute_phrase_scores(phrase_list)
-
-	n = min(len(phrase_list), n)
-	top_phrases = sorted(phrase_scores.items(), key=operator.itemgetter(1), reverse=True)[:n]
-
-	if return_scores == False:
-		return remove_scores(top_phrases)
-	return top_phrases
+	return analyze(document).top_phrases(n, return_scores)
 
-def top_sentences(document, n=2, return_scores=True, original_order=False):
+def top_sentences(document, n=2, return_scores=True, original_order=False, redundancy_threshold=None):
 	""" Return top n sentences after computing scores """
-
-	sentence_list = extract_sentences(document)
-	sentence_scores = compute_sentence_scores(document)
-
-	n = min(len(sentence_list), n)
-	top_sentences = sorted(sentence_scores.items(), key=operator.itemgetter(1), reverse=True)[:n]
-
-
-	#if original order is selected:
-	threshold = 0.8 #similarity threshold
-	min_length = 3 # words
-	ordered_top_sentences = []
-	if original_order == True:
-		no_score_top_sentences = remove_scores(top_sentences)
-		for original_sentence in sentence_list:
-			for top_sentence in no_score_top_sentences:
-				if sim.similar(original_sentence,top_sentence) > threshold:
-					num_words = len(original_sentence.split(' '))
-					if num_words > min_length:
-						ordered_top_sentences.append(original_sentence)
-		return ordered_top_sentences
-
-	if return_scores == False:
-		return remove_scores(top_sentences)
-	return top_sentences
+	return analyze(document).top_sentences(n, return_scores, original_order, redundancy_threshold)
 
 def summary(document, percentage):
-	all_sentences = extract_sentences(document)
-	num_sentence_to_extract= int(percentage* len(all_sentences))
-	key_sentence_list = top_sentences(document,n=num_sentence_to_extract, return_scores=False, original_order=True)
-	reduced_summary = ' '.join(key_sentence_list)
-	return reduced_summary
+	return analyze(document).summary(percentage)
 
 #
 #	testing
@@ -0,0 +1,50 @@
+#python 3
+
+"""
+	Lazy imports
+
+	heavy external packages (nltk, numpy, scipy) are bound at module level as
+	placeholders and imported on first attribute access, so importing a module
+	of this project does no work until one of its functions runs.
+
+	usage:
+		nltk = lazy_module('nltk')
+		sparse = lazy_module('scipy.sparse')
+"""
+
+#internal
+import importlib
+import types
+
+class LazyModule(types.ModuleType):
+	""" module placeholder, imports the real module on first attribute access and takes over its attributes """
+
+	def __init__(self, name):
+		super().__init__(name)
+		self.__dict__['_lazy_name'] = name
+		self.__dict__['_lazy_module'] = None
+
+	def _load(self):
+		module = importlib.import_module(self._lazy_name)
+		self.__dict__.update(module.__dict__)
+		self.__dict__['_lazy_module'] = module
+		return module
+
+	def __getattr__(self, attribute):
+		# only called for attributes not copied from the real module, such as submodules imported later
+		module = self._lazy_module
+		if module is None:
+			module = self._load()
+		return getattr(module, attribute)
+
+	def __repr__(self):
+		state = 'not loaded' if self._lazy_module is None else 'loaded'
+		return "<lazy module '%s' (%s)>" % (self._lazy_name, state)
+
+def lazy_module(name):
+	""" returns placeholder for module name, the import happens on first attribute access """
+	return LazyModule(name)
+
+def is_loaded(module):
+	""" returns False for lazy modules that have not been imported yet """
+	return not isinstance(module, LazyModule) or module._lazy_module is not None
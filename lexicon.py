@@ -0,0 +1,90 @@
+#python 3
+
+"""
+	Shared lexicon, stop words and punctuation
+
+	stop word lists are read from the nltk stopwords corpus once per language set,
+	converted to frozensets and shared by every module that filters tokens.
+
+	languages:
+		'english'				- single language
+		('english', 'german')	- several languages
+		None					- every language in the nltk stopwords corpus
+"""
+
+#internal
+import string
+import time
+import logging
+
+#external (imported on first use)
+from lazy_imports import lazy_module
+nltk = lazy_module('nltk')
+
+# logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+#
+#	Punctuation
+#
+
+PUNCTUATION = frozenset(string.punctuation)
+PUNCTUATION_WHITESPACE = frozenset(string.punctuation + string.whitespace)
+
+#
+#	Stop Words
+#
+
+ALL_LANGUAGES = None
+
+_stopword_sets = {}		# language key -> frozenset of stop words
+_load_times = {}		# language key -> seconds spent loading
+
+def _language_key(languages):
+	""" Return hashable key for language selection, None selects every language """
+	if languages is None:
+		return None
+	if isinstance(languages, str):
+		return (languages,)
+	return tuple(sorted(set(languages)))
+
+def stopwords(languages='english'):
+	""" Return frozenset of stop words for languages, loaded from nltk on first use """
+	key = _language_key(languages)
+	try:
+		return _stopword_sets[key]
+	except KeyError:
+		pass
+
+	start = time.perf_counter()
+	if key is None:
+		words = nltk.corpus.stopwords.words()
+	else:
+		words = []
+		for language in key:
+			words += nltk.corpus.stopwords.words(language)
+	stop_words = frozenset(words)
+	elapsed = time.perf_counter() - start
+
+	_stopword_sets[key] = stop_words
+	_load_times[key] = elapsed
+	logger.info('Loaded %d stop words for %s in %.4fs' % (len(stop_words), 'all languages' if key is None else ', '.join(key), elapsed))
+	return stop_words
+
+def is_stopword(word, languages='english'):
+	""" Return True if word is in stop word set for languages """
+	return word in stopwords(languages)
+
+def load_stats():
+	""" Return list of (languages, number of stop words, load seconds) for every loaded stop word set """
+	stats = []
+	for key, stop_words in _stopword_sets.items():
+		languages = 'all' if key is None else ','.join(key)
+		stats.append((languages, len(stop_words), _load_times[key]))
+	return stats
+
+def clear():
+	""" Drop loaded stop word sets, next lookup reloads from nltk """
+	_stopword_sets.clear()
+	_load_times.clear()
@@ -8,6 +8,12 @@
 import json
 import os
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+#mylibs
+import packed_corpus
+import instrumentation as inst
 
 # logging
 logging.basicConfig(level=logging.INFO)
@@ -17,31 +23,150 @@ logger = logging.getLogger(__name__)
 #	Data Set Methods
 #
 
+def load_packed_subreddit_document_set(path, subreddit, titles=False):
+	""" loads all documents from packed subreddit shard, see packed_corpus.
+	loose files scraped after packing are read in place of their shard entries """
+	logger.info('Loading Packed Document Set')
+
+	with inst.stage('io'), packed_corpus.PackedCorpus(path, subreddit) as corpus:
+		stale = packed_corpus.stale_files(path, subreddit, corpus.index)
+		stale_ids = set(stale)
+		documents = [corpus[document_id] for document_id in corpus.ids() if document_id not in stale_ids]
+	inst.count('documents_read', len(documents))
+
+	if titles != True:
+		documents = [document['text'] for document in documents]
+	documents.extend(_load_files(path, stale, titles))
+
+	logger.info('Document Set Loading Complete')
+	return documents
+
 def load_scraped_subreddit_document_set(path, subreddit, titles=False):
-	""" loads all json files from dataset matching subreddit format: "subreddit_fname.extension" and returns list of ['title','text'] """
+	""" loads all json files from dataset matching subreddit format: "subreddit_fname.extension" and returns list of ['title','text'].
+	reads the packed shard instead when one exists for subreddit, plus loose files scraped after packing """
+	if packed_corpus.has_packed_subreddit(path, subreddit):
+		return load_packed_subreddit_document_set(path, subreddit, titles)
+
 	logger.info('Loading Document Set')
+	documents = _load_files(path, packed_corpus.subreddit_files(path, subreddit), titles)
+	logger.info('Document Set Loading Complete')
+	return documents
 
-	files = [f for f in os.listdir(path) if f.split('_')[0] == subreddit]
+def _load_files(path, files, titles=False):
+	""" returns list of documents, or their text unless titles, of loose json files in path """
 	documents = []
 	for f in files:
-		with open(path + f) as data_file:    
-			data = json.load(data_file)
+		with inst.stage('io'):
+			with open(os.path.join(path, f)) as data_file:
+				data = json.load(data_file)
+		inst.count('documents_read')
 
-		"""
-		if titles == True:
-			documents.append([data['title'],data['text']])
-		else:
-			documents.append(data['text'])
-		"""
 		if titles == True:
 			document = data
 		else:
 			document = data['text']
 		documents.append(document)
-
-	logger.info('Document Set Loading Complete')
 	return documents
 
 def get_document_jsons_list(path = "data_set/",  subreddit = "worldnews"):
 	all_documents = load_scraped_subreddit_document_set(path,subreddit, True)
-	return all_documents
\ No newline at end of file
+	return all_documents
+
+#
+#	Streaming Methods
+#
+
+def list_subreddits(path):
+	""" returns sorted list of subreddits with loose files or packed shards in path """
+	subreddits = set()
+	for f in os.listdir(path):
+		if '_' in f:
+			subreddits.add(f.split('_')[0])
+		elif f.endswith(packed_corpus.shard_extension):
+			subreddits.add(f[:-len(packed_corpus.shard_extension)])
+	return sorted(subreddits)
+
+def _read_file(file_path):
+	with open(file_path, 'rb') as data_file:
+		return data_file.read()
+
+def _select(raw_json, fields, where):
+	""" decode document, returns None if it does not match where, otherwise the selected fields """
+	data = json.loads(raw_json)
+
+	if where is not None:
+		if callable(where):
+			if not where(data):
+				return None
+		elif any(data.get(field) != value for field, value in where.items()):
+			return None
+
+	if fields is None:
+		return data
+	if isinstance(fields, str):
+		return data[fields]
+	return {field: data[field] for field in fields}
+
+def iter_documents(path = "data_set/", subreddit = "worldnews", fields=None, where=None, workers=4, prefetch=16):
+	""" yields documents one at a time without materializing the corpus.
+
+	subreddit	- subreddit name, list of names, or None for every subreddit in path
+	fields		- None for the whole document, a field name ('text') to yield only its value,
+				  or list of field names ('title', 'text') to yield dictionaries of those fields
+	where		- dictionary field -> required value, or function document -> bool
+	workers		- threads reading files ahead of the consumer
+	prefetch	- maximum number of documents read ahead of the consumer
+
+	packed shards are read when they exist for a subreddit, loose files otherwise, plus loose
+	files scraped after packing in place of their shard entries.
+	threads only prefetch file contents, json is decoded whole in the consuming thread since
+	decoding holds the GIL, unselected fields are dropped before the document is yielded.
+	documents are yielded in the same order as they are listed """
+	if subreddit is None:
+		subreddits = list_subreddits(path)
+	elif isinstance(subreddit, str):
+		subreddits = [subreddit]
+	else:
+		subreddits = list(subreddit)
+
+	corpora = []
+	def readers():
+		for s in subreddits:
+			files = packed_corpus.subreddit_files(path, s)
+			if packed_corpus.has_packed_subreddit(path, s):
+				corpus = packed_corpus.PackedCorpus(path, s)
+				corpora.append(corpus)
+				files = packed_corpus.stale_files(path, s, corpus.index)
+				stale_ids = set(files)
+				for document_id in corpus.ids():
+					if document_id not in stale_ids:
+						yield lambda corpus=corpus, document_id=document_id: corpus.raw(document_id)
+			for f in files:
+				yield lambda file_path=os.path.join(path, f): _read_file(file_path)
+
+	def read_ahead(read):
+		with inst.stage('io'):
+			raw_json = read()
+		inst.count('documents_read')
+		return raw_json
+
+	pending = deque()
+	executor = ThreadPoolExecutor(max_workers=workers)
+	try:
+		for read in readers():
+			pending.append(executor.submit(read_ahead, read))
+			if len(pending) >= prefetch:
+				document = _select(pending.popleft().result(), fields, where)
+				if document is not None:
+					yield document
+
+		while len(pending) > 0:
+			document = _select(pending.popleft().result(), fields, where)
+			if document is not None:
+				yield document
+	finally:
+		for future in pending:
+			future.cancel()
+		executor.shutdown(wait=True)
+		for corpus in corpora:
+			corpus.close()
@@ -7,24 +7,27 @@ import logging
 import string
 import math
 
-import nltk
-from nltk.tokenize import RegexpTokenizer
-from nltk.stem import PorterStemmer
-from nltk import FreqDist
-from nltk.tag import pos_tag
+from lazy_imports import lazy_module
+nltk = lazy_module('nltk')
 
+# mylib
+import lexicon
+import stemming
+import instrumentation as inst
+import text_cache
+import tokenizers
+from document_frequency import DocumentFrequencyIndex
 
 # logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def is_stopword(word):
+def is_stopword(word, languages='english'):
 	""" Return True of word is in stop word list """
-	stop_words = nltk.corpus.stopwords.words('english')
-	return word in stop_words
+	return lexicon.is_stopword(word, languages)
 
 def is_punctuation(word):
-	return len(word) == 1 and word in string.punctuation
+	return len(word) == 1 and word in lexicon.PUNCTUATION
 
 def is_number(word):
 	try:
@@ -48,8 +51,7 @@ def is_shorter(word,n=3):
 	return False
 
 def stem(word):
-	ps = PorterStemmer()
-	return ps.stem(word)
+	return stemming.stem(word)
 
 
 def clean_word(raw_word):
@@ -66,23 +68,25 @@ def set_clean_raw_text(raw_text):
 	logger.debug('Cleaning Text')
 
 	#tokenize and lower sentence
-	tokenizer = RegexpTokenizer(r'\w+')
-	tokens = tokenizer.tokenize(raw_text.lower())		# tokens = nltk.word_tokenize(corpus.lower()) # without removing punctiation
+	with inst.stage('tokenize'):
+		tokens = tokenizers.word_chars(raw_text.lower())		# tokens = nltk.word_tokenize(corpus.lower()) # without removing punctiation
+	inst.count('tokens', len(tokens))
 
-	#remove stop words
-	tokens = [w for w in tokens if not is_stopword(w)]
+	with inst.stage('stopword'):
+		#remove stop words
+		tokens = [w for w in tokens if not is_stopword(w)]
 
-	#remove punctuation
-	tokens = [w for w in tokens if not is_punctuation(w)]
+		#remove punctuation
+		tokens = [w for w in tokens if not is_punctuation(w)]
 
-	#remove short 
-	tokens = [w for w in tokens if not is_shorter(w)]
+		#remove short 
+		tokens = [w for w in tokens if not is_shorter(w)]
 
-	#remove number
-	tokens = [w for w in tokens if not is_number(w)]
+		#remove number
+		tokens = [w for w in tokens if not is_number(w)]
 
 	#stem words
-	tokens = map(stem, tokens)
+	tokens = stemming.stem_batch(tokens)
 
 	logger.debug('Cleaning Text Complete')
 	return set(tokens)
@@ -91,30 +95,32 @@ def set_clean_tokens(raw_token_list):
 	""" clean tokenized sentence, convert to lower, stem, remove stop words, numbers, punctuation"""
 	logger.debug('Cleaning Text')
 
-	clean_tokens = []
-	for t in raw_token_list:
-		clean_token = clean_word(t)
-		if clean_token != "":
-			clean_tokens.append(clean_token)
+	with inst.stage('stopword'):
+		kept_tokens = []
+		for t in set(raw_token_list):
+			t = t.lower()
+			if not (is_stopword(t) or is_punctuation(t) or is_shorter(t) or is_number(t)):
+				kept_tokens.append(t)
 
-	return set(clean_tokens)
+	return set(stemming.stem_batch(kept_tokens))
 
 def processes_and_tokenize(raw_document):
 	""" remove punctuation, convert to lower case, and return list of tokens """
-	tokenizer = RegexpTokenizer(r'\w+')
-	tokens = tokenizer.tokenize(raw_document.lower())		# tokens = nltk.word_tokenize(corpus.lower()) # without removing punctiation
+	with inst.stage('tokenize'):
+		tokens = tokenizers.word_chars(raw_document.lower())		# tokens = nltk.word_tokenize(corpus.lower()) # without removing punctiation
+	inst.count('tokens', len(tokens))
 
 	#remove stop words
-	stop_words = set(nltk.corpus.stopwords.words('english'))
-	#stop_words = set(stopwords.words('english'))
-	filtered_tokens = [w for w in tokens if not w in stop_words]
+	with inst.stage('stopword'):
+		stop_words = lexicon.stopwords('english')
+		filtered_tokens = [w for w in tokens if not w in stop_words]
 	return filtered_tokens
 
 
 def word_frequency_dict(tokens):
 	""" returns a dictionary of word and their assosiated frequencies from token list """
 
-	fdist = FreqDist(tokens) 						# fdist.keys() fdist.values()
+	fdist = nltk.FreqDist(tokens) 						# fdist.keys() fdist.values()
 	return dict(fdist)
 
 def term_fequency(term,tokens):
@@ -134,6 +140,9 @@ def inverse_document_frequency(term, tokenized_documents_list):
 	""" IDF(t) = ln( Number Of Documents / Number Of Documents Containg Term )."""
 	term = processes_and_tokenize(term)[0]	#make sure term is in correct form
 
+	if isinstance(tokenized_documents_list, DocumentFrequencyIndex):
+		return tokenized_documents_list.inverse_document_frequency(term)
+
 	num_documents = len(tokenized_documents_list)
 	num_documents_with_term = len([document for document in tokenized_documents_list if term in document])
 	
@@ -145,6 +154,9 @@ def nolog_inverse_document_frequency(term, tokenized_documents_list):
 	""" IDF(t) = ln( Number Of Documents / Number Of Documents Containg Term )."""
 	term = processes_and_tokenize(term)[0]	#make sure term is in correct form
 
+	if isinstance(tokenized_documents_list, DocumentFrequencyIndex):
+		return tokenized_documents_list.nolog_inverse_document_frequency(term)
+
 	num_documents = len(tokenized_documents_list)
 	num_documents_with_term = len([document for document in tokenized_documents_list if term in document])
 	
@@ -165,8 +177,12 @@ def keyword_score(term, tokenized_document, tokenized_documents_list):
 	return tf_idf_scaler*term_tf_idf_score + term_similarity_score
 
 
-def keyword_scores_for_part_of_speech(pos, tokenized_document, tokenized_documents_list):
-	tagged_tokenized_document = pos_tag(tokenized_document)
+def keyword_scores_for_part_of_speech(pos, tokenized_document, tokenized_documents_list, tags=None):
+	""" returns tokens of document tagged pos, tags are the document tags stored by pos_tagging.tag_corpus, tagged here when None """
+	if tags is None:
+		tagged_tokenized_document = text_cache.pos_tags(tokenized_document)
+	else:
+		tagged_tokenized_document = zip(tokenized_document, tags)
 	filtered_tokens = [term for term, tag in tagged_tokenized_document if tag == pos]
 	return list(filtered_tokens)
 
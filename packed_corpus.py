@@ -0,0 +1,137 @@
+#python 3
+
+"""
+	Packed corpus format
+
+	one jsonl shard per subreddit, "subreddit.jsonl", with one json document per
+	line, and an offset index, "subreddit.idx", mapping document id to
+	[byte offset, byte length] in the shard. Shards are read through mmap so
+	documents can be fetched by id without parsing the rest of the corpus.
+
+	document id is the file name of the document in the data_set/ layout.
+	loose files scraped after packing, missing from the index or modified after the
+	shard was written, are stale_files and are read by the loaders in place of the shard.
+"""
+
+#internal
+import os
+import json
+import mmap
+import logging
+
+# logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+shard_extension = '.jsonl'
+index_extension = '.idx'
+
+def shard_paths(path, subreddit):
+	""" returns (shard path, index path) for subreddit in directory path """
+	return os.path.join(path, subreddit + shard_extension), os.path.join(path, subreddit + index_extension)
+
+def has_packed_subreddit(path, subreddit):
+	return all(os.path.exists(p) for p in shard_paths(path, subreddit))
+
+def subreddit_files(path, subreddit):
+	""" returns sorted names of loose json files of subreddit in data_set/ layout ("subreddit_fname.extension") """
+	return sorted(f for f in os.listdir(path) if f.split('_')[0] == subreddit)
+
+def stale_files(path, subreddit, index):
+	""" returns sorted names of loose files of subreddit missing from index or modified after the shard was written """
+	shard_mtime = os.path.getmtime(shard_paths(path, subreddit)[0])
+	stale = [f for f in subreddit_files(path, subreddit) if f not in index or os.path.getmtime(os.path.join(path, f)) > shard_mtime]
+	if len(stale) > 0:
+		logger.warning('%d loose %s files are newer than the packed shard, run pack_subreddit again' % (len(stale), subreddit))
+	return stale
+
+#
+#	Converter
+#
+
+def pack_subreddit(path, subreddit, out_path=None):
+	""" pack json files of subreddit in data_set/ layout ("subreddit_fname.extension") into shard and index, returns number of documents """
+	logger.info('Packing Subreddit: %s' % subreddit)
+
+	if out_path is None:
+		out_path = path
+	shard_path, index_path = shard_paths(out_path, subreddit)
+
+	files = subreddit_files(path, subreddit)
+	index = {}
+	with open(shard_path, 'wb') as shard:
+		for f in files:
+			with open(os.path.join(path, f)) as data_file:
+				data = json.load(data_file)
+
+			line = json.dumps(data).encode('utf-8') + b'\n'
+			index[f] = [shard.tell(), len(line)]
+			shard.write(line)
+
+	with open(index_path, 'w+') as outfile:
+		json.dump(index, outfile)
+
+	logger.info('Packing Complete: %d documents, %s' % (len(index), shard_path))
+	return len(index)
+
+#
+#	Reader
+#
+
+class PackedCorpus:
+	""" random access reader of a packed subreddit shard """
+
+	def __init__(self, path, subreddit):
+		shard_path, index_path = shard_paths(path, subreddit)
+
+		with open(index_path) as data_file:
+			self.index = json.load(data_file)
+
+		self._file = open(shard_path, 'rb')
+		if os.path.getsize(shard_path) > 0:
+			self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+		else:
+			self._mmap = b''	# empty files can not be mapped
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
+
+	def __len__(self):
+		return len(self.index)
+
+	def __contains__(self, document_id):
+		return document_id in self.index
+
+	def __getitem__(self, document_id):
+		""" returns document dictionary by id, raises KeyError for unknown ids """
+		offset, length = self.index[document_id]
+		return json.loads(self._mmap[offset:offset + length])
+
+	def __iter__(self):
+		""" yields documents in shard order """
+		for document_id in self.index:
+			yield self[document_id]
+
+	def ids(self):
+		return list(self.index)
+
+	def raw(self, document_id):
+		""" returns undecoded json bytes of document """
+		offset, length = self.index[document_id]
+		return self._mmap[offset:offset + length]
+
+	def close(self):
+		if isinstance(self._mmap, mmap.mmap):
+			self._mmap.close()
+		self._file.close()
+
+if __name__ == '__main__':
+	import sys
+
+	# usage: python packed_corpus.py [data_set/] [subreddit]
+	data_set_path = sys.argv[1] if len(sys.argv) > 1 else 'data_set/'
+	subreddit = sys.argv[2] if len(sys.argv) > 2 else 'worldnews'
+	pack_subreddit(data_set_path, subreddit)
@@ -0,0 +1,111 @@
+#python 3
+
+"""
+	Corpus level part of speech tagging
+
+	tag_corpus tags every tokenized document of a corpus in one pass. documents
+	already in text_cache are not tagged again, the rest are tagged with
+	nltk.pos_tag_sents in chunks spread over worker processes, each worker
+	loads the tagger once. tags are stored alongside the tokens in a TaggedCorpus,
+	so any number of part of speech filters run without tagging again.
+
+		corpus = pos_tagging.tag_corpus(tokenized_documents_list)
+		nouns = corpus.filter('NN')
+		verbs = corpus.filter(('VB', 'VBD', 'VBZ'))
+"""
+
+#internal
+import time
+import logging
+import multiprocessing
+
+#mylibs
+import text_cache
+import instrumentation as inst
+
+#external (imported on first use)
+from lazy_imports import lazy_module
+nltk = lazy_module('nltk')
+
+# logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+#
+#	Settings
+#
+
+chunksize = 16			# documents per pos_tag_sents call
+min_parallel = 64		# fewer untagged documents than this are tagged in this process
+
+#
+#	Tagged Corpus
+#
+
+class TaggedCorpus:
+	""" tokenized documents with a tag list per document, tags[i][j] is the tag of tokens[i][j] """
+
+	def __init__(self, tokens, tags):
+		assert len(tokens) == len(tags)
+		self.tokens = tokens
+		self.tags = tags
+
+	def __len__(self):
+		return len(self.tokens)
+
+	def tagged_document(self, i):
+		""" Returns list of (token, tag) of document i """
+		return list(zip(self.tokens[i], self.tags[i]))
+
+	def filter_document(self, i, pos):
+		""" Returns tokens of document i tagged pos, pos is a tag or collection of tags """
+		if isinstance(pos, str):
+			return [t for t, tag in zip(self.tokens[i], self.tags[i]) if tag == pos]
+		pos = frozenset(pos)
+		return [t for t, tag in zip(self.tokens[i], self.tags[i]) if tag in pos]
+
+	def filter(self, pos):
+		""" Returns list per document of tokens tagged pos """
+		return [self.filter_document(i, pos) for i in range(len(self.tokens))]
+
+#
+#	Tagging Methods
+#
+
+def init_worker():
+	""" process pool initializer, loads the tagger once per worker """
+	nltk.pos_tag(['warm'])
+
+def tag_chunk(documents):
+	""" Returns list of tag lists for list of token lists """
+	return [[tag for token, tag in tagged] for tagged in nltk.pos_tag_sents(documents)]
+
+def tag_corpus(tokenized_documents_list, workers=None):
+	""" Returns TaggedCorpus of tokenized documents, untagged documents are tagged in chunks on workers processes.
+	workers defaults to cpu count, 1 tags in this process """
+	tokenized_documents_list = [list(d) for d in tokenized_documents_list]
+	start = time.perf_counter()
+
+	tags = [text_cache.lookup('pos', text_cache.pos_tagger, text_cache.pos_key(d)) for d in tokenized_documents_list]
+	untagged = [i for i, d_tags in enumerate(tags) if d_tags is None]
+	documents = [tokenized_documents_list[i] for i in untagged]
+	chunks = [documents[i:i+chunksize] for i in range(0, len(documents), chunksize)]
+
+	if workers is None:
+		workers = multiprocessing.cpu_count()
+
+	with inst.stage('pos'):
+		if workers == 1 or len(documents) < min_parallel:
+			chunk_tags = [tag_chunk(chunk) for chunk in chunks]
+		else:
+			with multiprocessing.Pool(processes=min(workers, len(chunks)), initializer=init_worker) as pool:
+				chunk_tags = pool.map(tag_chunk, chunks)
+
+	new_tags = [d_tags for chunk in chunk_tags for d_tags in chunk]
+	for i, d_tags in zip(untagged, new_tags):
+		tags[i] = d_tags
+		text_cache.store('pos', text_cache.pos_tagger, text_cache.pos_key(tokenized_documents_list[i]), d_tags)
+
+	inst.count('documents_tagged', len(untagged))
+	logger.info('Tagged %d documents, %d from cache, in %.1fs' % (len(tags), len(tags) - len(untagged), time.perf_counter() - start))
+	return TaggedCorpus(tokenized_documents_list, tags)
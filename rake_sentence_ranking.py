@@ -17,26 +17,29 @@ import string
 import operator
 import re
 
-#external
-import numpy as np
-import nltk
-from nltk.tokenize import RegexpTokenizer
-from nltk import FreqDist
-from nltk.stem.porter import *
-from nltk.corpus import stopwords
-from nltk.tag import pos_tag
+#external (imported on first use)
+from lazy_imports import lazy_module
+np = lazy_module('numpy')
+nltk = lazy_module('nltk')
 
+#mylib
+import lexicon
+import instrumentation as inst
+import text_cache
+import tokenizers
 
 """
 	Rapid Automatic Keyword Extraction
 """
 
+# tokenizer backend name, None for tokenizers.default_backend
+tokenizer_backend = None
+
 def is_punctuation(word):
-	return len(word) == 1 and word in string.punctuation #or re.search('[^\w\d\s\-\_]{2}', word)
+	return len(word) == 1 and word in lexicon.PUNCTUATION #or re.search('[^\w\d\s\-\_]{2}', word)
 
-def is_stopword(word):
-	stop_words = nltk.corpus.stopwords.words()
-	return word in stop_words
+def is_stopword(word, languages=lexicon.ALL_LANGUAGES):
+	return lexicon.is_stopword(word, languages)
 
 def isNumeric(word):
 	try:
@@ -74,11 +77,15 @@ def break_word(word, marker):
 	return word
 
 def generate_candidate_keywords(sentences):
+	tokenizer = tokenizers.get(tokenizer_backend)
+	return candidate_keywords_from_words([tokenizer.words(sentence.lower()) for sentence in sentences])
+
+def candidate_keywords_from_words(sentence_words):
+	""" list of phrases, each a list of words, from lower cased word lists of sentences """
 	marker = "|"
 
 	phrase_list = []
-	for sentence in sentences:
-		sentence = nltk.word_tokenize(sentence.lower())
+	for sentence in sentence_words:
 		words = [break_word(w,marker) for w in sentence]
 		
 		phrase = []
@@ -103,27 +110,33 @@ def calculate_phrase_scores(phrase_list, word_scores):
 	return phrase_scores
 
 def calculate_word_scores(phrase_list):
-	word_freq = nltk.FreqDist()
-	word_degree = nltk.FreqDist()
-	for phrase in phrase_list:
-		degree = len(list(filter(lambda x: not isNumeric(x), phrase))) - 1
-		for word in phrase:
-			word_freq[word] += 1
-			word_degree[word] += degree
-	for word in word_freq.keys():
-		word_degree[word] = word_degree[word] + word_freq[word] # itself
-	# word score = deg(w) / freq(w)
-	word_scores = {}
-	for word in word_freq.keys():
-		word_scores[word] = word_degree[word] / word_freq[word]
-	return word_scores
-
-def extract(text):
-	sentences = nltk.sent_tokenize(text)
-
-	phrase_list = generate_candidate_keywords(sentences)
-	word_scores = calculate_word_scores(phrase_list)
-	phrase_scores = calculate_phrase_scores(phrase_list, word_scores)
+	""" word score = deg(w) / freq(w), counted over phrase list, see rake_statistics """
+	import rake_statistics		# rake_statistics imports this module, imported on first use so the dependency stays one way
+	return rake_statistics.RakeStatistics([phrase_list]).word_scores()
+
+def document_phrases(text):
+	""" candidate phrases of text, each a list of lower cased words """
+	sentences, sentence_words = text_cache.tokenize(text, lower_words=True, tokenizer=tokenizer_backend)
+	return candidate_keywords_from_words(sentence_words)
+
+def extract(text, statistics=None):
+	""" Returns candidate phrases of text sorted by score, scored with corpus rake_statistics.RakeStatistics when given, otherwise with the text alone """
+	with inst.stage('tokenize'):
+		sentences, sentence_words = text_cache.tokenize(text, lower_words=True, tokenizer=tokenizer_backend)
+
+	with inst.stage('phrase'):
+		phrase_list = candidate_keywords_from_words(sentence_words)
+
+	with inst.stage('score'):
+		if statistics is None:
+			word_scores = calculate_word_scores(phrase_list)
+			phrase_scores = calculate_phrase_scores(phrase_list, word_scores)
+		else:
+			phrase_scores = statistics.phrase_scores(phrase_list)
+
+	inst.count('documents')
+	inst.count('sentences', len(sentences))
+	inst.count('phrases', len(phrase_list))
 
 	sorted_phrase_scores = sorted(phrase_scores.items(), key=operator.itemgetter(1), reverse=True)
 	n_phrases = len(sorted_phrase_scores)
@@ -132,10 +145,14 @@ def extract(text):
 	return list(map(lambda x: x[0],sorted_phrase_scores[0:int(n_phrases/top_fraction)]))
 
 def top_words(text):
-	sentences = nltk.sent_tokenize(text)
+	with inst.stage('tokenize'):
+		sentences, sentence_words = text_cache.tokenize(text, lower_words=True, tokenizer=tokenizer_backend)
+
+	with inst.stage('phrase'):
+		phrase_list = candidate_keywords_from_words(sentence_words)
 
-	phrase_list = generate_candidate_keywords(sentences)
-	word_scores = calculate_word_scores(phrase_list)
+	with inst.stage('score'):
+		word_scores = calculate_word_scores(phrase_list)
 	sorted_word_scores = sorted(word_scores.items(), key=operator.itemgetter(1), reverse=True)
 	
 	top_picks = [ws[0] for ws in sorted_word_scores]
@@ -144,28 +161,59 @@ def top_words(text):
 """
 	rank sentences based on rank top phrases
 """
+class SentenceIndex:
+	""" word -> sentence ids inverted index, every sentence is tokenized and lower cased once """
+
+	def __init__(self, sentences):
+		self.sentences = sentences
+		self.word_sets = [set(tokenizers.word_chars(s.lower())) for s in sentences]
+
+		self.postings = {}
+		for sentence_id, words in enumerate(self.word_sets):
+			for word in words:
+				self.postings.setdefault(word, []).append(sentence_id)
+
+	def containing(self, words):
+		""" Returns ids, in document order, of sentences whose word set is a strict superset of words """
+		words = set(words)
+		if len(words) == 0:
+			return [i for i, sentence_words in enumerate(self.word_sets) if len(sentence_words) > 0]
+
+		postings = sorted((self.postings.get(w, []) for w in words), key=len)
+		if len(postings[0]) == 0:
+			return []
+
+		sentence_ids = set(postings[0])
+		for posting in postings[1:]:
+			sentence_ids.intersection_update(posting)
+			if len(sentence_ids) == 0:
+				return []
+		return sorted(i for i in sentence_ids if len(self.word_sets[i]) > len(words))
+
 def rank_sentences(text, max_sentences=None):
-	tokenizer = RegexpTokenizer(r'\w+')
-	sentences = nltk.sent_tokenize(text)
+	""" Returns sentences containing the top rake phrases, ordered by the rank of the first phrase they contain.
+	a sentence contains a phrase when the phrase words are a strict subset of the sentence words.
+	stops after max_sentences sentences """
+	sentences = text_cache.sentences(text, tokenizer_backend)
 	top_phrases = extract(text)
-	top_sentences = []
 
-	print(top_phrases)
+	with inst.stage('score'):
+		index = SentenceIndex(sentences)
+		top_sentences = []
+		seen = set()
+
+		for phrase in top_phrases:
+			if max_sentences is not None and len(top_sentences) >= max_sentences:
+				break
+			if len(seen) == len(sentences):
+				break
+
+			for i in index.containing(tokenizers.word_chars(phrase)):
+				s = sentences[i]
+				if s not in seen:
+					seen.add(s)
+					top_sentences.append(s)
+					if max_sentences is not None and len(top_sentences) >= max_sentences:
+						break
 
-	#max sentences
-	#if max_sentences is None:
-	#	max_sentences = max(len(top_phrases), len(sentences))
-	#max_sentences = min(len(top_phrases), len(sentences), max_sentences)
-
-	for i in range(len(top_phrases)):
-		tokenized_phrase = tokenizer.tokenize(top_phrases[i])
-		for s in sentences:
-
-			#print("\nphrase:%s,\n\nsentence:%s\n\n\n" % (str(set(tokenized_phrase)),str(set(tokenizer.tokenize(s.lower())) )))
-			
-			if (set(tokenized_phrase) < set(tokenizer.tokenize(s.lower()))) and (s not in top_sentences):
-				top_sentences.append(s)
-				
-				print(s)
 	return top_sentences
-
@@ -0,0 +1,243 @@
+#python 3
+
+"""
+	Mergeable RAKE word statistics
+
+	RAKE scores a word as deg(w) / freq(w), both sums over phrase occurrences, so
+	the statistics of a corpus are the sums of the statistics of its parts.
+	shards of a corpus are counted in parallel and merged, saved statistics are
+	updated as new documents arrive without reading the old documents again.
+
+		statistics = rake_statistics.corpus_statistics(texts, document_ids, workers=8)
+		statistics.add_document(new_text, new_id)
+		statistics.save('rake_statistics.json')
+		scores = statistics.phrase_scores(phrase_list)
+"""
+
+#internal
+import json
+import time
+import logging
+import itertools
+import threading
+import multiprocessing
+from collections import Counter
+
+#mylibs
+import rake_sentence_ranking as rake
+
+# logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class RakeStatistics:
+	""" word -> frequency and word -> degree sums over the phrases of every added document.
+	degree counts the other non numeric words of each phrase a word occurs in, the word itself is added when scoring """
+
+	def __init__(self, phrase_lists=None):
+		self.word_frequency = Counter()
+		self.word_degree = Counter()
+		self.num_documents = 0
+		self.document_ids = set()
+
+		if phrase_lists is not None:
+			for phrase_list in phrase_lists:
+				self.add_phrases(phrase_list)
+
+	def __len__(self):
+		return self.num_documents
+
+	def __contains__(self, word):
+		return word in self.word_frequency
+
+	#
+	#	Update Methods
+	#
+
+	def add_phrases(self, phrase_list, document_id=None, sign=1):
+		""" Count phrases of one document, each phrase a list of words. documents with an already counted id are skipped. Returns True if added """
+		if document_id is not None and sign > 0:
+			if document_id in self.document_ids:
+				return False
+			self.document_ids.add(document_id)
+
+		word_frequency = self.word_frequency
+		word_degree = self.word_degree
+		for phrase in phrase_list:
+			degree = sign * (len([word for word in phrase if not rake.isNumeric(word)]) - 1)
+			for word in phrase:
+				word_frequency[word] += sign
+				word_degree[word] += degree
+
+		self.num_documents += sign
+		return True
+
+	def add_document(self, text, document_id=None):
+		""" Count candidate phrases of text, returns True if added """
+		if document_id is not None and document_id in self.document_ids:
+			return False
+		return self.add_phrases(rake.document_phrases(text), document_id)
+
+	def add_documents(self, texts, document_ids=None):
+		""" Add texts, returns number of documents added """
+		if document_ids is None:
+			document_ids = itertools.repeat(None)
+
+		added = 0
+		for text, document_id in zip(texts, document_ids):
+			added += self.add_document(text, document_id)
+		return added
+
+	def remove_document(self, text, document_id):
+		""" Remove counts of document previously added with document_id, used before re-adding an updated document.
+		raises KeyError for an id that was never added, documents added without an id can not be removed """
+		if document_id not in self.document_ids:
+			raise KeyError(document_id)
+		self.document_ids.remove(document_id)
+
+		phrase_list = rake.document_phrases(text)
+		self.add_phrases(phrase_list, sign=-1)
+		for word in set(word for phrase in phrase_list for word in phrase):
+			if self.word_frequency[word] <= 0:
+				del self.word_frequency[word]
+				del self.word_degree[word]
+
+	def merge(self, other):
+		""" Add counts of other statistics, counted over different documents, raises ValueError when they share ids. Returns self """
+		overlap = self.document_ids & other.document_ids
+		if len(overlap) > 0:
+			raise ValueError('statistics share %d document ids, e.g. %s' % (len(overlap), next(iter(overlap))))
+
+		self.word_frequency.update(other.word_frequency)
+		self.word_degree.update(other.word_degree)
+		self.num_documents += other.num_documents
+		self.document_ids |= other.document_ids
+		return self
+
+	#
+	#	Scoring Methods
+	#
+
+	def word_score(self, word):
+		""" word score = deg(w) / freq(w), deg(w) includes the word itself """
+		frequency = self.word_frequency[word]
+		if frequency == 0:
+			return 0
+		return (self.word_degree[word] + frequency) / frequency
+
+	def word_scores(self):
+		""" Return dictionary of word scores """
+		return {word: self.word_score(word) for word in self.word_frequency}
+
+	def phrase_scores(self, phrase_list):
+		""" Return dictionary phrase -> sum of corpus word scores, each phrase a list of words """
+		return {" ".join(phrase): sum(self.word_score(word) for word in phrase) for phrase in phrase_list}
+
+	#
+	#	Storage Methods
+	#
+
+	def to_dict(self):
+		return {
+			'num_documents': self.num_documents,
+			'document_ids': sorted(self.document_ids, key=str),
+			'word_frequency': dict(self.word_frequency),
+			'word_degree': dict(self.word_degree)
+		}
+
+	@classmethod
+	def from_dict(cls, data):
+		statistics = cls()
+		statistics.num_documents = data['num_documents']
+		statistics.document_ids = set(data['document_ids'])
+		statistics.word_frequency = Counter(data['word_frequency'])
+		statistics.word_degree = Counter(data['word_degree'])
+		return statistics
+
+	def save(self, path):
+		""" Write statistics to json file """
+		logger.info('Saving Rake Statistics: %s' % path)
+		with open(path, 'w+') as outfile:
+			json.dump(self.to_dict(), outfile)
+
+	@classmethod
+	def load(cls, path):
+		""" Read statistics from json file """
+		logger.info('Loading Rake Statistics: %s' % path)
+		with open(path) as data_file:
+			return cls.from_dict(json.load(data_file))
+
+#
+#	Corpus Methods
+#
+
+def init_worker(tokenizer_backend=None):
+	rake.tokenizer_backend = tokenizer_backend
+
+def shard_statistics(shard):
+	""" pool task, returns statistics dictionary of list of (document id, text) """
+	statistics = RakeStatistics()
+	for document_id, text in shard:
+		statistics.add_document(text, document_id)
+	return statistics.to_dict()
+
+def corpus_statistics(texts, document_ids=None, workers=None, shard_size=256, statistics=None):
+	""" Count rake statistics of texts in shards on workers processes and merge them.
+	texts may be a generator, at most workers * 2 shards are held in memory at once.
+	an id repeated in document_ids is counted once, for its first text.
+	statistics	- existing statistics to update, documents with ids it already counted are skipped
+	workers		- processes, defaults to cpu count, 1 counts in this process """
+	if statistics is None:
+		statistics = RakeStatistics()
+	if workers is None:
+		workers = multiprocessing.cpu_count()
+	if document_ids is None:
+		document_ids = itertools.repeat(None)
+
+	start = time.perf_counter()
+	# copied before the pool feeder thread starts reading documents while this thread merges
+	seen = set(statistics.document_ids)
+
+	def documents():
+		""" (document id, text) pairs not counted yet, ids deduplicated before shards are dispatched so merging never sees shared ids """
+		for document_id, text in zip(document_ids, texts):
+			if document_id is not None:
+				if document_id in seen:
+					continue
+				seen.add(document_id)
+			yield document_id, text
+
+	documents = documents()
+	shards = iter(lambda: list(itertools.islice(documents, shard_size)), [])
+
+	if workers == 1:
+		for shard in shards:
+			statistics.merge(RakeStatistics.from_dict(shard_statistics(shard)))
+	else:
+		in_flight = threading.BoundedSemaphore(workers * 2)
+		stopped = threading.Event()
+
+		def submitted():
+			""" shards for the pool task feeder thread, blocks while workers * 2 shards are in flight """
+			for shard in shards:
+				in_flight.acquire()
+				if stopped.is_set():
+					return
+				yield shard
+
+		with multiprocessing.Pool(processes=workers, initializer=init_worker, initargs=(rake.tokenizer_backend,)) as pool:
+			try:
+				for shard_dict in pool.imap_unordered(shard_statistics, submitted()):
+					in_flight.release()
+					statistics.merge(RakeStatistics.from_dict(shard_dict))
+			finally:
+				# wake a feeder blocked on a full window so the pool can shut down after an error
+				stopped.set()
+				try:
+					while True:
+						in_flight.release()
+				except ValueError:
+					pass
+
+	logger.info('Rake Statistics: %d documents, %d words in %.1fs' % (statistics.num_documents, len(statistics.word_frequency), time.perf_counter() - start))
+	return statistics
@@ -18,14 +18,20 @@ import string
 import re
 import json
 import logging
+import time
+import argparse
+import threading
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # mylib
 from rake_sentence_ranking import *
+from scrape_manifest import ScrapeManifest, document_hash
+import instrumentation as inst
 #import normalizers as norm
 
-# external
-from newspaper import Article
-
 
 #
 # 								Settings
@@ -34,6 +40,15 @@ from newspaper import Article
 path = 'data_set/'
 subreddit = 'worldnews'
 
+base_url = 'https://www.reddit.com'
+user_agent = 'Mozilla/5.0'
+max_workers = 8			# concurrent downloads
+max_per_host = 2		# concurrent downloads per host
+min_interval = 0.25		# seconds between request starts per host
+timeout = 10			# seconds per request
+retries = 3
+backoff = 0.5			# retry sleep = backoff * 2^(retry - 1)
+
 # logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -42,7 +57,9 @@ def file_title(raw_title, file_prefix='', file_extension='.txt', max_characters=
 
 	# Cap Length / Generate Short Title
 	if len(raw_title) > max_characters:
-		raw_title = extract(raw_title)[0]
+		phrases = extract(raw_title)
+		if len(phrases) > 0:
+			raw_title = phrases[0]
 
 	# Format File Title
 
@@ -55,34 +72,159 @@ def file_title(raw_title, file_prefix='', file_extension='.txt', max_characters=
 	return file_title
 
 
-def save_subreddit_to_dir(subreddit, directory):
-	logger.info('Connecting to subreddit: %s' % subreddit)
-	r = requests.get(
-	    'http://www.reddit.com/r/{}.json'.format(subreddit),
-	    headers={'user-agent': 'Mozilla/5.0'}
-	)
-
-	for post in r.json()['data']['children']:
-		try:
-			title = post['data']['title']
-			url = post['data']['url']
-			fname = file_title(title, subreddit)
+#
+#	Connection Methods
+#
 
-			article = Article(url)
-			article.download()
-			article.parse()
-			text = article.text
+def new_session(pool_size=max_workers, retries=retries, backoff=backoff):
+	""" returns requests.Session with pooled connections, retries with exponential backoff on connection errors and 429/5xx """
+	retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=(429, 500, 502, 503, 504), allowed_methods=('GET',), respect_retry_after_header=True)
+	adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+	session = requests.Session()
+	session.mount('http://', adapter)
+	session.mount('https://', adapter)
+	session.headers.update({'user-agent': user_agent})
+	return session
+
+class HostLimiter:
+	""" caps concurrent requests per host and spaces request starts by min_interval seconds """
+
+	def __init__(self, max_per_host=max_per_host, min_interval=min_interval):
+		self.max_per_host = max_per_host
+		self.min_interval = min_interval
+		self._lock = threading.Lock()
+		self._semaphores = {}
+		self._next_start = {}
+
+	def _host_semaphore(self, host):
+		with self._lock:
+			if host not in self._semaphores:
+				self._semaphores[host] = threading.BoundedSemaphore(self.max_per_host)
+			return self._semaphores[host]
+
+	def _wait_turn(self, host):
+		with self._lock:
+			now = time.monotonic()
+			start = max(now, self._next_start.get(host, now))
+			self._next_start[host] = start + self.min_interval
+		time.sleep(start - now)
+
+	def get(self, session, url, **kwargs):
+		""" session.get limited by host """
+		host = urlparse(url).netloc
+		with self._host_semaphore(host):
+			self._wait_turn(host)
+			return session.get(url, **kwargs)
+
+def fetch(session, limiter, url, timeout=timeout, **kwargs):
+	""" returns response for url, raises requests.HTTPError on error status """
+	r = limiter.get(session, url, timeout=timeout, **kwargs)
+	r.raise_for_status()
+	return r
 
-			f = {'title': title, 'url':url, 'text':text}
+#
+#	Scraping Methods
+#
 
-			logger.info('Creating File: %s' % (directory + fname))
-			with open(directory + fname, 'w+') as outfile:
-				json.dump(f, outfile)
-		except:
-			logger.debug('failure in save_subreddit_to_dir')
+def iter_listing(session, limiter, subreddit, pages=1, limit=100, base_url=base_url, timeout=timeout):
+	""" yields post data from subreddit listing, following 'after' tokens for up to pages pages """
+	after = None
+	for page in range(pages):
+		params = {'limit': limit}
+		if after is not None:
+			params['after'] = after
+
+		logger.info('Fetching listing page %d of subreddit: %s' % (page + 1, subreddit))
+		listing = fetch(session, limiter, '{}/r/{}.json'.format(base_url, subreddit), timeout=timeout, params=params).json()
+
+		for post in listing['data']['children']:
+			yield post['data']
+
+		after = listing['data'].get('after')
+		if after is None:
+			break
+
+def scrape_post(session, limiter, post, subreddit, directory, manifest, recheck=False, timeout=timeout):
+	""" download and parse article linked by post unless manifest already has it, write json file to directory and return file name.
+	with recheck, known urls are revalidated with a conditional request and rewritten only if their content changed """
+	title = post['title']
+	url = post['url']
+
+	entry = manifest.get(url)
+	if entry is not None and not recheck:
+		manifest.mark(url, 'skipped')
+		return entry['file']
+
+	r = fetch(session, limiter, url, timeout=timeout, headers=manifest.request_headers(url))
+	if r.status_code == 304:
+		manifest.mark(url, 'skipped')
+		return entry['file']
+
+	from newspaper import Article		# heavy, imported on first use
+
+	article = Article(url)
+	article.download(input_html=r.text)
+	article.parse()
+	text = article.text
+
+	f = {'title': title, 'url':url, 'text':text}
+	text_hash = document_hash(f)
+	fname = manifest.file_name(url, file_title(title, subreddit))
+
+	if entry is None or entry['hash'] != text_hash:
+		logger.info('Creating File: %s' % (directory + fname))
+		with inst.stage('io'), open(directory + fname, 'w+') as outfile:
+			json.dump(f, outfile)
+
+	manifest.record(url, fname, text_hash, etag=r.headers.get('ETag'), last_modified=r.headers.get('Last-Modified'))
+	return fname
+
+def save_subreddit_to_dir(subreddit, directory, pages=1, recheck=False, max_workers=max_workers, max_per_host=max_per_host, min_interval=min_interval, timeout=timeout, retries=retries, base_url=base_url):
+	""" download new articles of subreddit listing concurrently, returns report dictionary of added, updated, skipped and failed urls """
+	logger.info('Connecting to subreddit: %s' % subreddit)
 
-	logger.info('Subreddit Scrapping Complete.')
+	manifest = ScrapeManifest(directory)
+	manifest.adopt_files(subreddit)
+	session = new_session(pool_size=max_workers, retries=retries)
+	limiter = HostLimiter(max_per_host, min_interval)
+
+	# a url listed twice would be saved by two threads at once under two file names, keep its first post
+	posts = []
+	listed_urls = set()
+	for post in iter_listing(session, limiter, subreddit, pages=pages, base_url=base_url, timeout=timeout):
+		if post['url'] not in listed_urls:
+			listed_urls.add(post['url'])
+			posts.append(post)
+
+	with ThreadPoolExecutor(max_workers=max_workers) as executor:
+		futures = {executor.submit(scrape_post, session, limiter, post, subreddit, directory, manifest, recheck, timeout): post for post in posts}
+		for future in as_completed(futures):
+			try:
+				future.result()
+			except Exception as e:
+				manifest.mark(futures[future].get('url'), 'failed')
+				logger.warning('Skipping failed post: %s, %s' % (futures[future].get('url'), e))
+
+	session.close()
+	manifest.save()
+
+	summary = manifest.summary()
+	logger.info('Subreddit Scrapping Complete. added: %d, updated: %d, skipped: %d, failed: %d' % (summary['added'], summary['updated'], summary['skipped'], summary['failed']))
+	return manifest.report
+
+def main(argv=None):
+	""" console entry point: scrape [--subreddit worldnews] [--path data_set/] """
+	parser = argparse.ArgumentParser(prog='scrape', description='save linked articles of a subreddit listing to the data set directory')
+	parser.add_argument('--subreddit', default=subreddit)
+	parser.add_argument('--path', default=path, help='data set directory')
+	parser.add_argument('--pages', type=int, default=1, help='listing pages to follow')
+	parser.add_argument('--recheck', action='store_true', help='revalidate already saved urls')
+	parser.add_argument('--workers', type=int, default=max_workers)
+	args = parser.parse_args(argv)
+
+	save_subreddit_to_dir(args.subreddit, args.path, pages=args.pages, recheck=args.recheck, max_workers=args.workers)
 
 if __name__ == '__main__':
-	save_subreddit_to_dir(subreddit, path)
+	main()
 
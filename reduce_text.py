@@ -7,22 +7,56 @@
 #internal
 import json
 import os
+import sys
 import logging
+import argparse
+import contextlib
 
 #mylibs
 import load_documents
 import normalizers as norm
 import keywords as key
+import rake_sentence_ranking as rake
 import similarity_measures as sim
+import instrumentation as inst
+import tokenizers
 
 # logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-all_documents = load_documents.get_document_jsons_list()
-
-d = all_documents[0]
-
-p = 0.3
-
-print(key.summary(d['text'],p))
\ No newline at end of file
+def main(argv=None):
+	""" console entry point: summarize [file] [-p percentage], summarizes the first data set document when no file is given, '-' reads stdin """
+	parser = argparse.ArgumentParser(prog='summarize', description='remove lowest scoring sentences from article to reduce size')
+	parser.add_argument('file', nargs='?', help="text file to summarize, '-' for stdin")
+	parser.add_argument('-p', '--percentage', type=float, default=0.3, help='fraction of sentences to keep')
+	parser.add_argument('--path', default='data_set/', help='data set directory')
+	parser.add_argument('--subreddit', default='worldnews')
+	parser.add_argument('--tokenizer', default=None, choices=sorted(tokenizers.backends), help='tokenizer backend, default %s' % tokenizers.default_backend)
+	parser.add_argument('--instrument', action='store_true', help='print per stage times and counters to stderr')
+	parser.add_argument('--profile', nargs='?', const='-', default=None, help="cProfile the run and write pstats to file, '-' or no file prints to stderr")
+	args = parser.parse_args(argv)
+
+	if args.instrument:
+		inst.enable()
+	key.tokenizer_backend = args.tokenizer
+	rake.tokenizer_backend = args.tokenizer
+	profile = inst.profile(None if args.profile == '-' else args.profile) if args.profile is not None else contextlib.ExitStack()
+
+	with profile:
+		if args.file == '-':
+			text = sys.stdin.read()
+		elif args.file is not None:
+			with open(args.file) as text_file:
+				text = text_file.read()
+		else:
+			d = next(load_documents.iter_documents(args.path, args.subreddit, fields=('title', 'text')))
+			text = d['text']
+
+		print(key.summary(text, args.percentage))
+
+	if args.instrument:
+		sys.stderr.write(inst.summary_table() + '\n')
+
+if __name__ == '__main__':
+	main()
\ No newline at end of file
@@ -7,13 +7,22 @@
 #internal
 import json
 import os
+import sys
 import logging
+import time
+import argparse
+import threading
+import multiprocessing
 
 #mylibs
 import load_documents
+import lexicon
 import normalizers as norm
 import keywords as key
+import rake_sentence_ranking as rake
 import similarity_measures as sim
+import instrumentation as inst
+import tokenizers
 
 # logging
 logging.basicConfig(level=logging.INFO)
@@ -30,45 +39,175 @@ def new_document_info(title='title', text='text', key_words=[], key_phrases=[],
 		'key_phrases_score' : key_phrases_score,
 		'key_sentences_score' : key_sentences_score,
 		'total_score': total_score,
-		'reduced_summary':summary_text
+		'reduced_summary':reduced_summary
 	}
 	return document_score_info
 
-all_documents = load_documents.get_document_jsons_list()
-all_documents_infos =[]
-
-for d in all_documents:
-
+def score_document(d):
+	""" returns document score info for document dictionary with 'title' and 'text' """
 	d_title = d['title']
 	d_text = d['text']
 
 	title_words_list = norm.processes_and_tokenize(d['title'])
 
-	key_words_list = remove_scores(key.top_words(d['text']))
-	key_phrase_list = remove_scores(key.top_phrases(d['text']))
-	key_sentence_list = remove_scores(key.top_sentences(d['text']))
+	analysis = key.DocumentAnalysis(d['text'])
+
+	key_words_list = analysis.top_words(return_scores=False)
+	key_phrase_list = analysis.top_phrases(return_scores=False)
+	key_sentence_list = analysis.top_sentences(return_scores=False)
 
 	key_words_score = sim.similarity_score(title_words_list, key_words_list)
 	key_phrases_score = sim.similarity_score(title_words_list, key_phrase_list)
 	key_sentences_score = sim.similarity_score(title_words_list, key_sentence_list)
 	total_score = key_words_score + key_phrases_score + key_sentences_score
 
-	summary_text = remove_scores(key.top_sentences(d['text'],original_order=True))
+	summary_text = analysis.top_sentences(return_scores=False, original_order=True)
 
 	d_info =  new_document_info(title=d_title,text=d_text, key_words=key_words_list, key_phrases=key_phrase_list, key_sentences=key_sentence_list, key_words_score=key_words_score, key_phrases_score=key_phrases_score, key_sentences_score=key_sentences_score, total_score=total_score, reduced_summary=summary_text)
-
-	all_documents_infos.append(d_info)
-
-d_with_max_score = all_documents_infos[0]
-for d in all_documents_infos:
-	if d['total_score'] > d_with_max_score['total_score']:
-		d_with_max_score = d
-
-#print (d_with_max_score['title'])
-#print (d_with_max_score['key_words'])
-#print (d_with_max_score['key_phrases'])
-#print (d_with_max_score['key_sentences'])
-
-
-
-
+	return d_info
+
+#
+#	Batch Methods
+#
+
+def warm_up():
+	""" load stop words, tokenizer models and stemmer so the first document does not pay for them """
+	lexicon.stopwords('english')
+	lexicon.stopwords(lexicon.ALL_LANGUAGES)
+	key.extract_words(key.extract_sentences('Warm up the tokenizers.')[0])
+	norm.stem('warming')
+
+def set_tokenizer_backend(tokenizer_backend):
+	""" use tokenizer backend name for keyword and rake extraction, None for tokenizers.default_backend """
+	key.tokenizer_backend = tokenizer_backend
+	rake.tokenizer_backend = tokenizer_backend
+
+def init_worker(max_memory_mb=None, instrument=False, tokenizer_backend=None):
+	""" process pool initializer, caps worker address space to max_memory_mb and loads nltk resources once per worker """
+	if max_memory_mb is not None:
+		import resource
+		limit = int(max_memory_mb * 1024 * 1024)
+		resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+	set_tokenizer_backend(tokenizer_backend)
+	warm_up()
+	if instrument:
+		inst.enable()
+	inst.reset()
+
+def score_document_instrumented(d):
+	""" pool task returning (document score info, instrumentation snapshot), worker totals are reset after every document """
+	d_info = score_document(d)
+	snapshot = inst.snapshot()
+	inst.reset()
+	return d_info, snapshot
+
+def score_documents(documents, workers=None, chunksize=8, max_tasks_per_child=None, max_memory_mb=None, progress_every=100):
+	""" score documents on a process pool and return document score infos in input order.
+
+	workers				- number of processes, defaults to cpu count, 1 scores in this process
+	chunksize			- documents sent to a worker per task
+	max_tasks_per_child	- restart workers after this many tasks to release memory
+	max_memory_mb		- address space limit per worker, a worker over the limit fails with MemoryError
+	progress_every		- log progress after every n documents, None for no progress reporting
+
+	at most workers * chunksize * 4 documents are in flight, a new document is submitted as each result arrives,
+	so workers never drain between batches and a streamed corpus is never fully held in memory """
+	if workers is None:
+		workers = multiprocessing.cpu_count()
+
+	start = time.perf_counter()
+	all_documents_infos = []
+
+	def report_progress():
+		num_scored = len(all_documents_infos)
+		if progress_every and num_scored % progress_every == 0:
+			elapsed = time.perf_counter() - start
+			logger.info('Scored %d documents in %.1fs, %.2f documents/s' % (num_scored, elapsed, num_scored / elapsed))
+
+	documents = iter(documents)
+	if workers == 1:
+		warm_up()
+		for d in documents:
+			all_documents_infos.append(score_document(d))
+			report_progress()
+	else:
+		in_flight = threading.BoundedSemaphore(workers * chunksize * 4)
+		stopped = threading.Event()
+
+		def submitted():
+			""" documents for the pool task feeder thread, blocks while the window is full """
+			for d in documents:
+				in_flight.acquire()
+				if stopped.is_set():
+					return
+				yield d
+
+		instrument = inst.enabled
+		task = score_document_instrumented if instrument else score_document
+		with multiprocessing.Pool(processes=workers, initializer=init_worker, initargs=(max_memory_mb, instrument, key.tokenizer_backend), maxtasksperchild=max_tasks_per_child) as pool:
+			try:
+				for result in pool.imap(task, submitted(), chunksize):
+					in_flight.release()
+					if instrument:
+						result, snapshot = result
+						inst.merge(snapshot)
+					all_documents_infos.append(result)
+					report_progress()
+			finally:
+				# wake a feeder blocked on a full window so the pool can shut down after an error
+				stopped.set()
+				try:
+					while True:
+						in_flight.release()
+				except ValueError:
+					pass
+
+	logger.info('Scoring Complete: %d documents in %.1fs' % (len(all_documents_infos), time.perf_counter() - start))
+	return all_documents_infos
+
+def main(argv=None):
+	""" console entry point: score [--path data_set/] [--subreddit worldnews] [--workers n] """
+	parser = argparse.ArgumentParser(prog='score', description='score key word, phrase and sentence extraction against article titles')
+	parser.add_argument('--path', default='data_set/', help='data set directory')
+	parser.add_argument('--subreddit', default='worldnews')
+	parser.add_argument('--workers', type=int, default=None, help='worker processes, defaults to cpu count')
+	parser.add_argument('--chunksize', type=int, default=8)
+	parser.add_argument('--max-memory-mb', type=float, default=None, help='address space limit per worker')
+	parser.add_argument('--tokenizer', default=None, choices=sorted(tokenizers.backends), help='tokenizer backend, default %s' % tokenizers.default_backend)
+	parser.add_argument('--instrument', action='store_true', help='print per stage times and counters to stderr')
+	parser.add_argument('--instrument-output', default=None, help='write per stage times and counters as json')
+	parser.add_argument('--profile', nargs='?', const='-', default=None, help="cProfile the run and write pstats to file, '-' or no file prints to stderr, profiles this process only so use --workers 1")
+	args = parser.parse_args(argv)
+
+	if args.instrument or args.instrument_output:
+		inst.enable()
+	set_tokenizer_backend(args.tokenizer)
+
+	documents = load_documents.iter_documents(args.path, args.subreddit, fields=('title', 'text'))
+	if args.profile is not None:
+		with inst.profile(None if args.profile == '-' else args.profile):
+			all_documents_infos = score_documents(documents, workers=args.workers, chunksize=args.chunksize, max_memory_mb=args.max_memory_mb)
+	else:
+		all_documents_infos = score_documents(documents, workers=args.workers, chunksize=args.chunksize, max_memory_mb=args.max_memory_mb)
+
+	if args.instrument:
+		sys.stderr.write(inst.summary_table() + '\n')
+	if args.instrument_output:
+		inst.save(args.instrument_output)
+
+	if len(all_documents_infos) == 0:
+		return
+
+	d_with_max_score = all_documents_infos[0]
+	for d in all_documents_infos:
+		if d['total_score'] > d_with_max_score['total_score']:
+			d_with_max_score = d
+
+	#print (d_with_max_score['title'])
+	#print (d_with_max_score['key_words'])
+	#print (d_with_max_score['key_phrases'])
+	#print (d_with_max_score['key_sentences'])
+	print ("%s\t%f" % (d_with_max_score['title'], d_with_max_score['total_score']))
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,145 @@
+#python 3
+
+"""
+	Scrape manifest
+
+	url -> content hash -> stored file, kept as json next to the scraped
+	documents. The scraper checks it before downloading so repeat runs only
+	fetch new or changed articles, and uses it to give every url its own file.
+	files scraped before the manifest existed are adopted on the first run.
+"""
+
+#internal
+import os
+import json
+import hashlib
+import logging
+import threading
+
+# logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+manifest_file_name = 'manifest.json'
+
+def content_hash(text):
+	""" returns sha256 hex digest of text """
+	return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def document_hash(document):
+	""" returns content hash of scraped document dictionary, over the fields the scraper writes """
+	return content_hash(json.dumps({'title': document.get('title'), 'url': document.get('url'), 'text': document.get('text')}, sort_keys=True))
+
+class ScrapeManifest:
+	""" url -> {'hash', 'file', 'etag', 'last_modified'} for a scraped document directory """
+
+	def __init__(self, directory):
+		self.directory = directory
+		self.path = os.path.join(directory, manifest_file_name)
+		self.entries = {}
+		self.report = {'added': [], 'updated': [], 'skipped': [], 'failed': []}
+		self._reserved = set()
+		self._lock = threading.Lock()
+
+		if os.path.exists(self.path):
+			with open(self.path) as data_file:
+				self.entries = json.load(data_file)
+			logger.info('Loaded Scrape Manifest: %s, %d urls' % (self.path, len(self.entries)))
+
+	def __contains__(self, url):
+		return url in self.entries
+
+	def get(self, url):
+		""" returns manifest entry for url if its file still exists, otherwise None """
+		entry = self.entries.get(url)
+		if entry is None or not os.path.exists(os.path.join(self.directory, entry['file'])):
+			return None
+		return entry
+
+	def _read_document(self, fname):
+		""" returns document dictionary stored in fname, None if it can not be read """
+		try:
+			with open(os.path.join(self.directory, fname)) as data_file:
+				data = json.load(data_file)
+		except (OSError, ValueError):
+			return None
+		return data if isinstance(data, dict) else None
+
+	def adopt_files(self, subreddit):
+		""" add entries for files of subreddit ("subreddit_fname.extension") no entry refers to, keyed by the url stored in the file.
+		returns number of files adopted """
+		with self._lock:
+			known = set(e['file'] for e in self.entries.values())
+			adopted = 0
+			for fname in sorted(os.listdir(self.directory)):
+				if fname.split('_')[0] != subreddit or fname in known:
+					continue
+				document = self._read_document(fname)
+				if document is None or not document.get('url') or document['url'] in self.entries:
+					continue
+				self.entries[document['url']] = {'hash': document_hash(document), 'file': fname, 'etag': None, 'last_modified': None}
+				adopted += 1
+
+		if adopted > 0:
+			logger.info('Adopted %d existing %s files into Scrape Manifest' % (adopted, subreddit))
+		return adopted
+
+	def request_headers(self, url):
+		""" returns conditional request headers from stored etag / last modified of url """
+		headers = {}
+		entry = self.get(url)
+		if entry is not None:
+			if entry.get('etag'):
+				headers['If-None-Match'] = entry['etag']
+			if entry.get('last_modified'):
+				headers['If-Modified-Since'] = entry['last_modified']
+		return headers
+
+	def file_name(self, url, fname):
+		""" returns file name for url, the stored one if url is known, otherwise fname made unique against other urls.
+		an existing fname no entry refers to is reused if it stores the same url or none """
+		with self._lock:
+			entry = self.entries.get(url)
+			if entry is not None:
+				return entry['file']
+
+			taken = set(e['file'] for e in self.entries.values()) | self._reserved
+			if fname in taken or (os.path.exists(os.path.join(self.directory, fname)) and not self._same_url(fname, url)):
+				root, extension = os.path.splitext(fname)
+				fname = root + '_' + hashlib.sha1(url.encode('utf-8')).hexdigest()[:8] + extension
+			self._reserved.add(fname)
+			return fname
+
+	def _same_url(self, fname, url):
+		document = self._read_document(fname)
+		return document is not None and document.get('url') in (None, url)
+
+	def record(self, url, fname, text_hash, etag=None, last_modified=None):
+		""" store entry for url, returns 'added', 'updated' or 'skipped' (same content hash) """
+		with self._lock:
+			entry = self.entries.get(url)
+			if entry is None:
+				status = 'added'
+			elif entry['hash'] == text_hash and entry['file'] == fname:
+				status = 'skipped'
+			else:
+				status = 'updated'
+
+			self.entries[url] = {'hash': text_hash, 'file': fname, 'etag': etag, 'last_modified': last_modified}
+			self.report[status].append(url)
+			return status
+
+	def mark(self, url, status):
+		""" add url to report under status without changing its entry """
+		with self._lock:
+			self.report[status].append(url)
+
+	def save(self):
+		with self._lock:
+			with open(self.path, 'w+') as outfile:
+				json.dump(self.entries, outfile)
+		logger.info('Saved Scrape Manifest: %s, %d urls' % (self.path, len(self.entries)))
+
+	def summary(self):
+		""" returns dictionary status -> number of urls """
+		return {status: len(urls) for status, urls in self.report.items()}
@@ -0,0 +1,262 @@
+#python 3
+
+"""
+	Summarization and keyword server
+
+	long running local http server, worker processes load nltk tokenizers,
+	stop words and wordnet once and serve batched requests from then on.
+	binds to 127.0.0.1 by default and uses no outside services.
+
+	endpoints:
+		POST /summary		{"documents": [text, ...], "percentage": 0.3}
+		POST /top_words		{"documents": [text, ...], "n": 5}
+		POST /top_phrases	{"documents": [text, ...], "n": 5}
+		POST /rake			{"documents": [text, ...], "n": null}
+		POST /batch			{"tasks": [{"task": "summary", "text": text, ...}, ...]}
+		GET  /stats			throughput and latency statistics
+		GET  /health
+
+	responses are {"results": [...]} in request order.
+
+	usage:
+		serve [--host 127.0.0.1] [--port 8765] [--workers n] [--tokenizer nltk|regex]
+"""
+
+#internal
+import os
+import json
+import time
+import logging
+import argparse
+import threading
+import statistics
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+#mylibs
+import keywords as key
+import rake_sentence_ranking as rake
+import score_algorithm
+import wordnet_cache
+import tokenizers
+
+# logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+#
+#	Settings
+#
+
+host = '127.0.0.1'
+port = 8765
+max_workers = None		# defaults to cpu count
+chunksize = 4
+latency_window = 1000	# requests kept for latency percentiles
+
+#
+#	Worker Methods
+#
+
+def init_worker(tokenizer_backend=None):
+	""" select tokenizer backend, load tokenizers, stop words, stemmer and wordnet once per worker process """
+	score_algorithm.set_tokenizer_backend(tokenizer_backend)
+	score_algorithm.warm_up()
+	wordnet_cache.synset_name('warm')
+
+def run_task(task):
+	""" run single task dictionary {'task', 'text', ...options} and return json serializable result """
+	name = task['task']
+	text = task['text']
+
+	n = task.get('n')
+	return_scores = task.get('return_scores', True)
+
+	if name == 'summary':
+		return key.summary(text, task.get('percentage', 0.3))
+	if name == 'top_words':
+		return key.top_words(text, n=5 if n is None else n, return_scores=return_scores)
+	if name == 'top_phrases':
+		return key.top_phrases(text, n=5 if n is None else n, return_scores=return_scores)
+	if name == 'rake':
+		phrases = rake.extract(text)
+		return phrases if n is None else phrases[:n]
+	raise ValueError('unknown task: %s' % name)
+
+tasks = ('summary', 'top_words', 'top_phrases', 'rake')
+
+def request_batch(name, request):
+	""" Returns list of task dictionaries of parsed request body for endpoint name, raises ValueError for a malformed request """
+	if not isinstance(request, dict):
+		raise ValueError('request body must be a json object')
+
+	if name == 'batch':
+		batch = request.get('tasks')
+		if not isinstance(batch, list):
+			raise ValueError('tasks must be a list')
+	else:
+		documents = request.get('documents')
+		if not isinstance(documents, list):
+			raise ValueError('documents must be a list')
+		options = {k: v for k, v in request.items() if k != 'documents'}
+		batch = [dict(options, task=name, text=text) for text in documents]
+
+	for i, task in enumerate(batch):
+		if not isinstance(task, dict):
+			raise ValueError('task %d must be a json object' % i)
+		if task.get('task') not in tasks:
+			raise ValueError('task %d: unknown task %r' % (i, task.get('task')))
+		if not isinstance(task.get('text'), str):
+			raise ValueError('task %d: text must be a string' % i)
+		validate_options(i, task)
+	return batch
+
+def validate_options(i, task):
+	""" raises ValueError unless n is an int >= 0 or null, percentage a number in [0, 1] and return_scores a bool """
+	n = task.get('n')
+	if n is not None and (isinstance(n, bool) or not isinstance(n, int) or n < 0):
+		raise ValueError('task %d: n must be an integer >= 0 or null' % i)
+
+	percentage = task.get('percentage', 0.3)
+	if isinstance(percentage, bool) or not isinstance(percentage, (int, float)) or not 0 <= percentage <= 1:
+		raise ValueError('task %d: percentage must be a number from 0 to 1' % i)
+
+	if not isinstance(task.get('return_scores', True), bool):
+		raise ValueError('task %d: return_scores must be true or false' % i)
+
+#
+#	Statistics
+#
+
+class ServerStats:
+	""" request, document and error counts with latency percentiles over the last latency_window requests """
+
+	def __init__(self, window=latency_window):
+		self.start = time.time()
+		self.requests = 0
+		self.documents = 0
+		self.errors = 0
+		self.latencies = deque(maxlen=window)
+		self._lock = threading.Lock()
+
+	def record(self, num_documents, seconds, error=False):
+		with self._lock:
+			self.requests += 1
+			self.documents += num_documents
+			self.errors += error
+			self.latencies.append(seconds)
+
+	def summary(self):
+		with self._lock:
+			latencies = sorted(self.latencies)
+			uptime = time.time() - self.start
+			stats = {
+				'uptime_seconds': uptime,
+				'requests': self.requests,
+				'documents': self.documents,
+				'errors': self.errors,
+				'requests_per_second': self.requests / uptime if uptime > 0 else 0.0,
+				'documents_per_second': self.documents / uptime if uptime > 0 else 0.0,
+			}
+
+		if len(latencies) > 0:
+			def percentile(p):
+				return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+			stats['latency_seconds'] = {
+				'mean': statistics.mean(latencies),
+				'p50': percentile(0.50),
+				'p95': percentile(0.95),
+				'p99': percentile(0.99),
+				'max': latencies[-1]
+			}
+		return stats
+
+#
+#	Server
+#
+
+class RequestHandler(BaseHTTPRequestHandler):
+	""" json request handler, server.executor runs tasks and server.stats records them """
+
+	def log_message(self, format, *args):
+		logger.debug(format % args)
+
+	def send_json(self, status, data):
+		body = json.dumps(data).encode('utf-8')
+		self.send_response(status)
+		self.send_header('Content-Type', 'application/json')
+		self.send_header('Content-Length', str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def do_GET(self):
+		if self.path == '/stats':
+			self.send_json(200, self.server.stats.summary())
+		elif self.path == '/health':
+			self.send_json(200, {'status': 'ok'})
+		else:
+			self.send_json(404, {'error': 'not found'})
+
+	def do_POST(self):
+		start = time.perf_counter()
+		name = self.path.strip('/')
+		try:
+			if name != 'batch' and name not in tasks:
+				self.send_json(404, {'error': 'not found'})
+				return
+
+			length = int(self.headers.get('Content-Length', 0))
+			request = json.loads(self.rfile.read(length) or b'{}')
+			batch = request_batch(name, request)
+		except ValueError as e:
+			self.server.stats.record(0, time.perf_counter() - start, error=True)
+			self.send_json(400, {'error': 'bad request: %s' % e})
+			return
+
+		try:
+			results = list(self.server.executor.map(run_task, batch, chunksize=chunksize))
+		except Exception as e:
+			self.server.stats.record(len(batch), time.perf_counter() - start, error=True)
+			self.send_json(500, {'error': str(e)})
+			return
+
+		self.server.stats.record(len(batch), time.perf_counter() - start)
+		self.send_json(200, {'results': results})
+
+def new_server(host=host, port=port, workers=max_workers, tokenizer_backend=None):
+	""" returns ThreadingHTTPServer with warm worker pool attached as server.executor, call serve_forever() to run.
+	tokenizer_backend is the tokenizers backend name workers use, None for tokenizers.default_backend """
+	num_workers = workers or os.cpu_count()
+	executor = ProcessPoolExecutor(max_workers=num_workers, initializer=init_worker, initargs=(tokenizer_backend,))
+
+	# start every worker now so the first requests do not pay for loading models
+	list(executor.map(time.sleep, [0.05] * num_workers))
+
+	server = ThreadingHTTPServer((host, port), RequestHandler)
+	server.executor = executor
+	server.stats = ServerStats()
+
+	logger.info('Server ready on http://%s:%d with %d workers' % (server.server_address[0], server.server_address[1], num_workers))
+	return server
+
+def main(argv=None):
+	""" console entry point: serve [--host 127.0.0.1] [--port 8765] [--workers n] [--tokenizer nltk|regex] """
+	parser = argparse.ArgumentParser(prog='serve', description='local summarization and keyword server with warm models')
+	parser.add_argument('--host', default=host)
+	parser.add_argument('--port', type=int, default=port)
+	parser.add_argument('--workers', type=int, default=max_workers, help='worker processes, defaults to cpu count')
+	parser.add_argument('--tokenizer', default=None, choices=sorted(tokenizers.backends), help='tokenizer backend, default %s' % tokenizers.default_backend)
+	args = parser.parse_args(argv)
+
+	server = new_server(args.host, args.port, args.workers, args.tokenizer)
+	try:
+		server.serve_forever()
+	except KeyboardInterrupt:
+		pass
+	finally:
+		server.server_close()
+		server.executor.shutdown(wait=True)
+
+if __name__ == '__main__':
+	main()
@@ -1,6 +1,19 @@
 #python 3
 
+#internal
+import math
+import time
+from collections import Counter
+from functools import lru_cache
+
+#mylib
 import normalizers as norm
+import instrumentation as inst
+
+#external (imported on first use)
+from lazy_imports import lazy_module
+np = lazy_module('numpy')
+sparse = lazy_module('scipy.sparse')
 
 """
 similarity measures
@@ -43,14 +56,80 @@ def overlap_coefficient(a, b):
 
 	return overlap_coefficient
 
+#
+#	Batch Methods
+#
+
+def clean_token_sets(texts):
+	""" normalize each text once, returns list of clean token sets.
+	a text is a token list, or a str which is tokenized first """
+	return [norm.set_clean_raw_text(t) if isinstance(t, str) else norm.set_clean_tokens(t) for t in texts]
+
+def binary_token_matrix(token_sets, vocabulary):
+	""" returns sparse binary matrix, row per token set, column per vocabulary word """
+	rows, cols = [], []
+	for row, token_set in enumerate(token_sets):
+		for t in token_set:
+			rows.append(row)
+			cols.append(vocabulary[t])
+	data = np.ones(len(rows), dtype=np.int32)
+	return sparse.csr_matrix((data, (rows, cols)), shape=(len(token_sets), len(vocabulary)))
+
+def pairwise_intersections(a_texts, b_texts=None):
+	""" returns (N x M array of intersection sizes, array of a set sizes, array of b set sizes).
+	each text is normalized once, b_texts defaults to a_texts """
+	a_sets = clean_token_sets(a_texts)
+	b_sets = a_sets if b_texts is None else clean_token_sets(b_texts)
+
+	vocabulary = {}
+	for token_set in a_sets + b_sets:
+		for t in token_set:
+			vocabulary.setdefault(t, len(vocabulary))
+
+	a_matrix = binary_token_matrix(a_sets, vocabulary)
+	b_matrix = a_matrix if b_texts is None else binary_token_matrix(b_sets, vocabulary)
+
+	intersections = (a_matrix @ b_matrix.T).toarray()
+	a_sizes = np.asarray(a_matrix.sum(axis=1)).ravel()
+	b_sizes = np.asarray(b_matrix.sum(axis=1)).ravel()
+	return intersections, a_sizes, b_sizes
+
+def jaccard_similarity_matrix(a_texts, b_texts=None):
+	""" N x M matrix of jaccard_similarity_coefficient for every pair of a_texts and b_texts.
+	texts are token lists, str texts (e.g. sentence against title) are tokenized first """
+	intersections, a_sizes, b_sizes = pairwise_intersections(a_texts, b_texts)
+
+	unions = a_sizes[:, None] + b_sizes[None, :] - intersections
+	with np.errstate(divide='ignore', invalid='ignore'):
+		jaccard_indexes = np.where(unions > 0, intersections / unions, 0.0)
+
+	#empty sets
+	jaccard_indexes[a_sizes == 0, :] = 0
+	jaccard_indexes[:, b_sizes == 0] = 0
+	return jaccard_indexes
+
+def overlap_coefficient_matrix(a_texts, b_texts=None):
+	""" N x M matrix of overlap_coefficient for every pair of a_texts and b_texts.
+	texts are token lists, str texts (e.g. sentence against title) are tokenized first """
+	intersections, a_sizes, b_sizes = pairwise_intersections(a_texts, b_texts)
+
+	smaller_sizes = np.minimum(a_sizes[:, None], b_sizes[None, :])
+	with np.errstate(divide='ignore', invalid='ignore'):
+		overlap_coefficients = np.where(smaller_sizes > 0, intersections / smaller_sizes, 0.0)
+	return overlap_coefficients
+
 
 from difflib import SequenceMatcher
 def similar(a, b):
     return SequenceMatcher(None, a, b).ratio()
 
 # similarity between character similarity
-def total_char_similarity(a,b):
-	""" compute similarity score of characters for each word in cartesian product"""
+def total_char_similarity(a,b, mode='exact'):
+	""" compute similarity score of characters for each word in cartesian product.
+	mode 'exact' uses difflib SequenceMatcher, mode 'ngram' uses character n-gram profiles calibrated to the same scale """
+	if mode == 'ngram':
+		return ngram_char_similarity(a,b)
+
 	a_words, b_words = map(norm.set_clean_tokens, [a,b])
 
 	total_score = 0
@@ -59,16 +138,104 @@ def total_char_similarity(a,b):
 			total_score += similar(ai, bi)
 	return total_score
 
-def similarity_score(a,b):
+#
+#	Character N-gram Methods
+#
+
+# difflib ratio of two unrelated words is around 0.2 where their n-gram cosine is 0, so
+# exact ~ ngram_scale * ngram cosine sum + ngram_background * word pairs.
+# least squares fit by calibrate_ngram_similarity, see python benchmarks.py char_similarity
+ngram_scale = 0.70
+ngram_background = 0.23
+
+@lru_cache(maxsize=100000)
+def char_ngram_profile(word, n=3):
+	""" returns dictionary n-gram -> weight, unit length count vector of space padded word (shared, do not modify) """
+	padded = ' ' + word + ' '
+	grams = Counter(padded[i:i+n] for i in range(max(1, len(padded)-n+1)))
+	length = math.sqrt(sum(c*c for c in grams.values()))
+	return {g: c/length for g, c in grams.items()}
+
+def ngram_profile_matrix(words, vocabulary, n=3):
+	""" returns array, row per word, column per n-gram in vocabulary """
+	matrix = np.zeros((len(words), len(vocabulary)))
+	for row, word in enumerate(words):
+		for g, weight in char_ngram_profile(word, n).items():
+			matrix[row, vocabulary[g]] = weight
+	return matrix
+
+def ngram_cosine_sum(a_words, b_words, n=3):
+	""" sum of cosine similarities of character n-gram profiles for each pair of clean words in cartesian product.
+	the sum over all pairs equals the dot product of the summed profiles of each side """
+	a_words, b_words = list(a_words), list(b_words)
+	if len(a_words) == 0 or len(b_words) == 0:
+		return 0
+
+	vocabulary = {}
+	for word in a_words + b_words:
+		for g in char_ngram_profile(word, n):
+			vocabulary.setdefault(g, len(vocabulary))
+
+	a_profiles = ngram_profile_matrix(a_words, vocabulary, n)
+	b_profiles = ngram_profile_matrix(b_words, vocabulary, n)
+	return float(a_profiles.sum(axis=0) @ b_profiles.sum(axis=0))
+
+def ngram_features(a, b, n=3):
+	""" returns (n-gram cosine sum, number of word pairs) of clean words of a and b, each normalized once """
+	a_words, b_words = map(norm.set_clean_tokens, [a,b])
+	return ngram_cosine_sum(a_words, b_words, n), len(a_words) * len(b_words)
+
+def ngram_char_similarity(a, b, n=3):
+	""" approximate total_char_similarity on its difflib ratio scale from character n-gram cosines """
+	cosine_sum, word_pairs = ngram_features(a, b, n)
+	return ngram_scale * cosine_sum + ngram_background * word_pairs
+
+def calibrate_ngram_similarity(pairs, n=3):
+	""" least squares fit of total_char_similarity exact mode over list of (a, b) pairs.
+	returns (scale, background) for ngram_scale and ngram_background """
+	exact_scores = np.array([total_char_similarity(a, b, mode='exact') for a, b in pairs])
+	features = np.array([ngram_features(a, b, n) for a, b in pairs])
+	scale, background = np.linalg.lstsq(features, exact_scores, rcond=None)[0]
+	return float(scale), float(background)
+
+def compare_char_similarity_modes(pairs, n=3):
+	""" accuracy versus speed of ngram mode against exact mode over list of (a, b) pairs.
+	returns dictionary of timings, speedup, mean scores, mean absolute error, mean relative error and correlation """
+	exact_start = time.perf_counter()
+	exact_scores = [total_char_similarity(a, b, mode='exact') for a, b in pairs]
+	exact_seconds = time.perf_counter() - exact_start
+
+	ngram_start = time.perf_counter()
+	ngram_scores = [ngram_char_similarity(a, b, n) for a, b in pairs]
+	ngram_seconds = time.perf_counter() - ngram_start
+
+	exact_scores, ngram_scores = np.array(exact_scores), np.array(ngram_scores)
+	errors = np.abs(exact_scores - ngram_scores)
+	nonzero = exact_scores > 0
+
+	comparison = {
+		'pairs': len(pairs),
+		'exact_seconds': exact_seconds,
+		'ngram_seconds': ngram_seconds,
+		'speedup': exact_seconds / ngram_seconds if ngram_seconds > 0 else float('inf'),
+		'mean_exact': float(exact_scores.mean()) if len(pairs) > 0 else 0.0,
+		'mean_ngram': float(ngram_scores.mean()) if len(pairs) > 0 else 0.0,
+		'mean_absolute_error': float(errors.mean()) if len(pairs) > 0 else 0.0,
+		'mean_relative_error': float((errors[nonzero] / exact_scores[nonzero]).mean()) if nonzero.any() else 0.0,
+		'correlation': float(np.corrcoef(exact_scores, ngram_scores)[0, 1]) if len(pairs) > 1 else 1.0
+	}
+	return comparison
+
+def similarity_score(a,b, char_mode='exact'):
 	""" combine all similarity measures into single score """
 	jsc_scaler = 15
 	ocs_scaler = 5
 	tcss_scaler = 0.05
 
-	jaccard_similarity_coefficient_score = jsc_scaler * jaccard_similarity_coefficient(a,b)
-	overlap_coefficient_score = ocs_scaler * overlap_coefficient(a,b)
-	total_char_similarity_score = tcss_scaler * total_char_similarity(a,b)
-	total_score = jaccard_similarity_coefficient_score + overlap_coefficient_score + total_char_similarity_score
+	with inst.stage('similarity'):
+		jaccard_similarity_coefficient_score = jsc_scaler * jaccard_similarity_coefficient(a,b)
+		overlap_coefficient_score = ocs_scaler * overlap_coefficient(a,b)
+		total_char_similarity_score = tcss_scaler * total_char_similarity(a,b, mode=char_mode)
+		total_score = jaccard_similarity_coefficient_score + overlap_coefficient_score + total_char_similarity_score
 	
 	return total_score
-
@@ -0,0 +1,95 @@
+#python 3
+
+"""
+	Memoized Porter stemming
+
+	one PorterStemmer is shared by every call, stems are kept in a bounded
+	least recently used word -> stem table which can be saved and reloaded
+	between runs.
+"""
+
+#internal
+import json
+import logging
+from collections import OrderedDict
+
+#mylibs
+import instrumentation as inst
+
+#external (imported on first use)
+from lazy_imports import lazy_module
+nltk = lazy_module('nltk')
+
+# logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+#
+#	Settings
+#
+
+max_table_size = 100000
+
+_stemmer = None
+_stem_table = OrderedDict()		# word -> stem, least recently used first
+
+def _get_stemmer():
+	global _stemmer
+	if _stemmer is None:
+		_stemmer = nltk.stem.PorterStemmer()
+	return _stemmer
+
+def _evict():
+	""" drop least recently used stems until table fits max_table_size """
+	while len(_stem_table) > max_table_size:
+		_stem_table.popitem(last=False)
+
+#
+#	Stemming Methods
+#
+
+def stem(word):
+	""" Return porter stem of word, cached by word """
+	try:
+		stemmed = _stem_table[word]
+		_stem_table.move_to_end(word)
+		return stemmed
+	except KeyError:
+		pass
+
+	stemmed = _get_stemmer().stem(word)
+	_stem_table[word] = stemmed
+	_evict()
+	return stemmed
+
+def stem_batch(tokens):
+	""" Return list of stems for tokens, each unique token is stemmed once """
+	with inst.stage('stem'):
+		tokens = list(tokens)
+		stems = {word: stem(word) for word in set(tokens)}
+		return [stems[word] for word in tokens]
+
+#
+#	Stem Table Methods
+#
+
+def table_size():
+	return len(_stem_table)
+
+def clear_table():
+	_stem_table.clear()
+
+def save_table(path):
+	""" Write word -> stem table to json file """
+	logger.info('Saving Stem Table: %s' % path)
+	with open(path, 'w+') as outfile:
+		json.dump(_stem_table, outfile)
+
+def load_table(path):
+	""" Merge word -> stem table from json file into current table """
+	logger.info('Loading Stem Table: %s' % path)
+	with open(path) as data_file:
+		data = json.load(data_file)
+	_stem_table.update(data)
+	_evict()
+	return len(data)
@@ -0,0 +1,306 @@
+#python 3
+
+"""
+	Bounded memory streaming top k phrases
+
+	phrases of a document stream are counted in two heavy hitter sketches of fixed
+	size, the corpus wide top k can be read at any point of the stream.
+
+	Space-Saving (Metwally, Agrawal, El Abbadi 2005)
+		keeps capacity (item, count, error) entries. an unseen item replaces the entry
+		with the smallest count m and starts at m + 1, remembering m as its error.
+		with N the total count added:
+			true count <= count <= true count + error, error <= N / capacity
+			every item with true count > N / capacity is in the summary
+
+	Count-Min sketch (Cormode, Muthukrishnan 2005)
+		depth rows of width counters, an item increments one counter per row and is
+		estimated by the smallest of its counters. with epsilon = e / width and
+		delta = e^-depth:
+			true count <= estimate
+			estimate <= true count + epsilon * N with probability at least 1 - delta
+
+	both are upper bounds, the reported count of a top k phrase is the smaller of the
+	two and count - error is a guaranteed lower bound. memory is capacity entries plus
+	width * depth 8 byte counters, independent of the number of distinct phrases.
+
+	usage:
+		python streaming_topk.py [--path data_set/] [--subreddit worldnews] [-k 20] [--source rake|keywords]
+"""
+
+#internal
+import math
+import json
+import heapq
+import hashlib
+import logging
+import argparse
+
+#mylibs
+import keywords as key
+import rake_sentence_ranking as rake
+import load_documents
+
+#external (imported on first use)
+from lazy_imports import lazy_module
+np = lazy_module('numpy')
+
+# logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+#
+#	Space-Saving
+#
+
+class SpaceSaving:
+	""" capacity heavy hitter counters, item -> count overestimate and its error bound """
+
+	def __init__(self, capacity=1000):
+		self.capacity = capacity
+		self.counts = {}
+		self.errors = {}
+		self.total = 0
+		self._heap = []		# (count, item), entries whose count changed since are skipped
+
+	def __len__(self):
+		return len(self.counts)
+
+	def __contains__(self, item):
+		return item in self.counts
+
+	def _push(self, item):
+		heapq.heappush(self._heap, (self.counts[item], item))
+		if len(self._heap) > 4 * self.capacity:
+			self._heap = [(count, item) for item, count in self.counts.items()]
+			heapq.heapify(self._heap)
+
+	def _pop_min(self):
+		while True:
+			count, item = heapq.heappop(self._heap)
+			if self.counts.get(item) == count:
+				return count, item
+
+	def add(self, item, count=1):
+		self.total += count
+		if item in self.counts:
+			self.counts[item] += count
+		elif len(self.counts) < self.capacity:
+			self.counts[item] = count
+			self.errors[item] = 0
+		else:
+			min_count, min_item = self._pop_min()
+			del self.counts[min_item]
+			del self.errors[min_item]
+			self.counts[item] = min_count + count
+			self.errors[item] = min_count
+		self._push(item)
+
+	def min_count(self):
+		""" count an item missing from a full summary may have at most, 0 while not full """
+		if len(self.counts) < self.capacity:
+			return 0
+		return min(self.counts.values())
+
+	def top(self, n=None):
+		""" Returns list of (item, count, error) sorted by count """
+		ranked = sorted(self.counts.items(), key=lambda x: x[1], reverse=True)
+		return [(item, count, self.errors[item]) for item, count in ranked[:n]]
+
+	def merge(self, other):
+		""" Add other summary of a different stream, items missing from a full summary count as its min_count. Returns self """
+		self_min = self.min_count()
+		other_min = other.min_count()
+
+		counts = {}
+		errors = {}
+		for item in set(self.counts) | set(other.counts):
+			counts[item] = self.counts.get(item, self_min) + other.counts.get(item, other_min)
+			errors[item] = self.errors.get(item, self_min) + other.errors.get(item, other_min)
+
+		kept = heapq.nlargest(self.capacity, counts, key=counts.get)
+		self.counts = {item: counts[item] for item in kept}
+		self.errors = {item: errors[item] for item in kept}
+		self.total += other.total
+		self._heap = [(count, item) for item, count in self.counts.items()]
+		heapq.heapify(self._heap)
+		return self
+
+#
+#	Count-Min Sketch
+#
+
+class CountMinSketch:
+	""" depth x width counter table, estimates are upper bounds of true counts """
+
+	def __init__(self, width=2**14, depth=5):
+		self.width = width
+		self.depth = depth
+		self.table = np.zeros((depth, width), dtype=np.int64)
+		self.total = 0
+		self._rows = np.arange(depth)
+
+	@classmethod
+	def from_error(cls, epsilon, delta):
+		""" sketch whose estimates exceed true counts by at most epsilon * N with probability 1 - delta """
+		return cls(width=int(math.ceil(math.e / epsilon)), depth=int(math.ceil(math.log(1 / delta))))
+
+	def _columns(self, item):
+		""" one counter per row from two 64 bit hashes, h1 + row * h2, stable across processes so sketches merge """
+		digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+		h1 = int.from_bytes(digest[:8], 'little')
+		h2 = int.from_bytes(digest[8:], 'little') | 1
+		return [(h1 + row * h2) % self.width for row in range(self.depth)]
+
+	def add(self, item, count=1):
+		self.table[self._rows, self._columns(item)] += count
+		self.total += count
+
+	def estimate(self, item):
+		return int(self.table[self._rows, self._columns(item)].min())
+
+	def epsilon(self):
+		return math.e / self.width
+
+	def delta(self):
+		return math.exp(-self.depth)
+
+	def merge(self, other):
+		""" Add other sketch of the same shape. Returns self """
+		if (self.width, self.depth) != (other.width, other.depth):
+			raise ValueError('sketch shapes differ: %dx%d and %dx%d' % (self.depth, self.width, other.depth, other.width))
+		self.table += other.table
+		self.total += other.total
+		return self
+
+#
+#	Streaming Top K
+#
+
+phrase_sources = {
+	'rake': lambda text: [' '.join(phrase) for phrase in rake.document_phrases(text)],
+	'keywords': lambda text: [phrase for phrase in key.extract_phrases(text) if len(phrase) > 0]
+}
+
+class StreamingTopK:
+	""" corpus wide top k phrases in fixed memory, Space-Saving candidates with Count-Min estimates """
+
+	def __init__(self, k=20, capacity=None, width=2**14, depth=5):
+		self.k = k
+		self.space_saving = SpaceSaving(capacity or 50 * k)
+		self.sketch = CountMinSketch(width, depth)
+		self.num_documents = 0
+
+	def add(self, item, count=1):
+		self.space_saving.add(item, count)
+		self.sketch.add(item, count)
+
+	def update(self, items):
+		for item in items:
+			self.add(item)
+
+	def add_document(self, text, source='rake'):
+		""" count phrases of text from phrase source 'rake' (rake_sentence_ranking) or 'keywords' """
+		self.update(phrase_sources[source](text))
+		self.num_documents += 1
+
+	def add_documents(self, texts, source='rake'):
+		for text in texts:
+			self.add_document(text, source)
+
+	def top(self, n=None):
+		""" Returns list of (phrase, count, lower bound) of the n, default k, most frequent phrases so far.
+		count is the smaller of both sketch estimates, true count lies in [lower bound, count] """
+		ranked = []
+		for item, count, error in self.space_saving.top():
+			ranked.append((item, min(count, self.sketch.estimate(item)), count - error))
+		ranked.sort(key=lambda x: x[1], reverse=True)
+		return ranked[:n or self.k]
+
+	def error_bounds(self):
+		""" Returns dictionary of the current worst case overestimates, see module docstring """
+		total = self.space_saving.total
+		return {
+			'total': total,
+			'documents': self.num_documents,
+			'space_saving_max_error': total / self.space_saving.capacity,
+			'count_min_epsilon': self.sketch.epsilon(),
+			'count_min_delta': self.sketch.delta(),
+			'count_min_max_error': self.sketch.epsilon() * total
+		}
+
+	def memory_entries(self):
+		""" Returns fixed sizes, space saving entries and count min counters """
+		return {'space_saving_entries': self.space_saving.capacity, 'count_min_counters': self.sketch.width * self.sketch.depth}
+
+	def merge(self, other):
+		""" Add top k of another stream with the same sketch shape. Returns self """
+		self.space_saving.merge(other.space_saving)
+		self.sketch.merge(other.sketch)
+		self.num_documents += other.num_documents
+		return self
+
+	def save(self, path):
+		""" Write sketches to json file """
+		logger.info('Saving Streaming Top K: %s' % path)
+		data = {
+			'k': self.k,
+			'num_documents': self.num_documents,
+			'capacity': self.space_saving.capacity,
+			'counts': self.space_saving.counts,
+			'errors': self.space_saving.errors,
+			'space_saving_total': self.space_saving.total,
+			'table': self.sketch.table.tolist(),
+			'sketch_total': self.sketch.total
+		}
+		with open(path, 'w+') as outfile:
+			json.dump(data, outfile)
+
+	@classmethod
+	def load(cls, path):
+		""" Read sketches from json file """
+		logger.info('Loading Streaming Top K: %s' % path)
+		with open(path) as data_file:
+			data = json.load(data_file)
+
+		table = np.array(data['table'], dtype=np.int64)
+		top_k = cls(data['k'], data['capacity'], width=table.shape[1], depth=table.shape[0])
+		top_k.num_documents = data['num_documents']
+		top_k.space_saving.counts = data['counts']
+		top_k.space_saving.errors = data['errors']
+		top_k.space_saving.total = data['space_saving_total']
+		top_k.space_saving._heap = [(count, item) for item, count in data['counts'].items()]
+		heapq.heapify(top_k.space_saving._heap)
+		top_k.sketch.table = table
+		top_k.sketch.total = data['sketch_total']
+		return top_k
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='corpus wide top k phrases in bounded memory')
+	parser.add_argument('--path', default='data_set/', help='data set directory')
+	parser.add_argument('--subreddit', default='worldnews', help='subreddit name')
+	parser.add_argument('-k', type=int, default=20)
+	parser.add_argument('--source', default='rake', choices=sorted(phrase_sources))
+	parser.add_argument('--capacity', type=int, default=None, help='space saving entries, default 50 * k')
+	parser.add_argument('--width', type=int, default=2**14, help='count min counters per row')
+	parser.add_argument('--depth', type=int, default=5, help='count min rows')
+	parser.add_argument('--report-every', type=int, default=0, help='print top k after every n documents')
+	parser.add_argument('--output', default=None, help='save sketches as json')
+	args = parser.parse_args(argv)
+
+	top_k = StreamingTopK(args.k, args.capacity, args.width, args.depth)
+	for text in load_documents.iter_documents(args.path, args.subreddit, fields='text'):
+		top_k.add_document(text, args.source)
+		if args.report_every and top_k.num_documents % args.report_every == 0:
+			print ("\n%d documents: %s" % (top_k.num_documents, ', '.join(item for item, count, lower in top_k.top())))
+
+	print ("%-60s %10s %12s" % ('phrase', 'count', 'lower bound'))
+	for item, count, lower in top_k.top():
+		print ("%-60s %10d %12d" % (item, count, lower))
+	print (json.dumps(top_k.error_bounds()))
+
+	if args.output is not None:
+		top_k.save(args.output)
+
+if __name__ == '__main__':
+	main()
@@ -12,16 +12,19 @@ import logging
 
 # mylib
 from rake_sentence_ranking import *
-
-#external
-import numpy as np
-import nltk
-from nltk.tokenize import RegexpTokenizer
-from nltk import FreqDist
-from nltk.stem.porter import *
-from nltk.corpus import stopwords
-from nltk.tag import pos_tag
-from nltk.corpus import wordnet
+import load_documents
+import lexicon
+from document_frequency import DocumentFrequencyIndex
+from tfidf_matrix import TfIdfMatrix
+import wordnet_cache
+import instrumentation as inst
+import text_cache
+import tokenizers
+
+#external (imported on first use)
+from lazy_imports import lazy_module
+np = lazy_module('numpy')
+nltk = lazy_module('nltk')
 
 # logging
 logging.basicConfig(level=logging.INFO)
@@ -33,20 +36,10 @@ logger = logging.getLogger(__name__)
 
 def load_scraped_subreddit_document_set(path, subreddit, titles=False):
 	""" loads all json files from dataset matching subreddit format: "subreddit_fname.extension" and returns list of ['title','text'] """
-	logger.info('Loading Document Set')
-
-	files = [f for f in os.listdir(path) if f.split('_')[0] == subreddit]
-	documents = []
-	for f in files:
-		with open(path + f) as data_file:    
-			data = json.load(data_file)
-
-		if titles == True:
-			documents.append([data['title'],data['text']])
-		else:
-			documents.append(data['text'])
+	documents = load_documents.load_scraped_subreddit_document_set(path, subreddit, titles)
 
-	logger.info('Document Set Loading Complete')
+	if titles == True:
+		return [[data['title'],data['text']] for data in documents]
 	return documents
 
 #
@@ -55,12 +48,7 @@ def load_scraped_subreddit_document_set(path, subreddit, titles=False):
 
 def syns_tag(term):
 	""" returns word wordnet.synset """
-	try:
-		syns = wordnet.synsets(term)
-		name = syns[0].name()
-		return wordnet.synset(name)
-	except:
-		return None
+	return wordnet_cache.syns_tag(term)
 
 def similarity_score(term, tokenized_document):
 	""" Calculates similarity score for word against all other words in document """
@@ -69,33 +57,7 @@ def similarity_score(term, tokenized_document):
 	#minimum score
 	minimum_score = .7
 
-	# format words to wordnet.synset
-	main_tagged_word = syns_tag(term)
-
-	if main_tagged_word is not None:
-		tokenized_tagged_document = []
-		for t in tokenized_document:
-			try:
-				tokenized_tagged_document.append(syns_tag(t))
-			except: pass
-
-		# calculate similarity score
-		similarity_scores = []
-		for t in tokenized_tagged_document:
-			try:
-				ss = main_tagged_word.wup_similarity(t)
-			except:
-				ss = None
-			if ss is not None and type(ss) :
-				if ss > minimum_score:
-					similarity_scores.append(ss)
-		summed_similarity_scores = sum(similarity_scores)
-
-		assert len(tokenized_tagged_document) > 0
-		score = summed_similarity_scores / len(tokenized_tagged_document)
-		return score
-
-	else: return 0
+	return wordnet_cache.similarity_scores([term], tokenized_document, minimum_score)[term]
 
 #
 #	Processing Methods
@@ -103,16 +65,18 @@ def similarity_score(term, tokenized_document):
 
 def processes_and_tokenize(raw_document):
 	""" remove punctuation, convert to lower case, and return list of tokens """
-	logger.info('Cleaning Text')
+	logger.debug('Cleaning Text')
 
-	tokenizer = RegexpTokenizer(r'\w+')
-	tokens = tokenizer.tokenize(raw_document.lower())		# tokens = nltk.word_tokenize(corpus.lower()) # without removing punctiation
+	with inst.stage('tokenize'):
+		tokens = tokenizers.word_chars(raw_document.lower())		# tokens = nltk.word_tokenize(corpus.lower()) # without removing punctiation
+	inst.count('tokens', len(tokens))
 
 	#remove stop words
-	stop_words = set(stopwords.words('english'))
-	filtered_tokens = [w for w in tokens if not w in stop_words]
+	with inst.stage('stopword'):
+		stop_words = lexicon.stopwords('english')
+		filtered_tokens = [w for w in tokens if not w in stop_words]
 
-	logger.info('Cleaning Text Complete')
+	logger.debug('Cleaning Text Complete')
 	return filtered_tokens
 
 #
@@ -121,16 +85,16 @@ def processes_and_tokenize(raw_document):
 
 def word_frequency_dict(tokens):
 	""" returns a dictionary of word and their assosiated frequencies from token list """
-	logger.info('Building Word Frequency Dictionary')
+	logger.debug('Building Word Frequency Dictionary')
 
-	fdist = FreqDist(tokens) 						# fdist.keys() fdist.values()
-	logger.info('Word Frequency Dictionary Completed')
+	fdist = nltk.FreqDist(tokens) 						# fdist.keys() fdist.values()
+	logger.debug('Word Frequency Dictionary Completed')
 
 	return dict(fdist)
 
 def term_fequency(term,tokens):
 	""" Return term frequency / number of terms in token list """
-	logger.info('Calculating Term Frequency')
+	logger.debug('Calculating Term Frequency')
 
 	term = processes_and_tokenize(term)[0]	#make sure term is in correct form
 
@@ -139,7 +103,7 @@ def term_fequency(term,tokens):
 
 def augmented_term_fequency(term,tokens):
 	""" returns term frequency in tokens over maximum term frequency of tokens """
-	logger.info('Calculating Augmented Term Frequency')
+	logger.debug('Calculating Augmented Term Frequency')
 
 	term = processes_and_tokenize(term)[0] #make sure term is in correct form
 
@@ -148,10 +112,13 @@ def augmented_term_fequency(term,tokens):
 
 def inverse_document_frequency(term, tokenized_documents_list):
 	""" IDF(t) = ln( Number Of Documents / Number Of Documents Containg Term )."""
-	logger.info('Calculating IDF')
+	logger.debug('Calculating IDF')
 
 	term = processes_and_tokenize(term)[0]	#make sure term is in correct form
 
+	if isinstance(tokenized_documents_list, DocumentFrequencyIndex):
+		return tokenized_documents_list.inverse_document_frequency(term)
+
 	num_documents = len(tokenized_documents_list)
 	num_documents_with_term = len([document for document in tokenized_documents_list if term in document])
 	
@@ -161,10 +128,13 @@ def inverse_document_frequency(term, tokenized_documents_list):
 
 def nolog_inverse_document_frequency(term, tokenized_documents_list):
 	""" IDF(t) = ln( Number Of Documents / Number Of Documents Containg Term )."""
-	logger.info('Calculating no-log IDF')
+	logger.debug('Calculating no-log IDF')
 
 	term = processes_and_tokenize(term)[0]	#make sure term is in correct form
 
+	if isinstance(tokenized_documents_list, DocumentFrequencyIndex):
+		return tokenized_documents_list.nolog_inverse_document_frequency(term)
+
 	num_documents = len(tokenized_documents_list)
 	num_documents_with_term = len([document for document in tokenized_documents_list if term in document])
 	
@@ -173,7 +143,7 @@ def nolog_inverse_document_frequency(term, tokenized_documents_list):
 
 def tf_idf(term, tokenized_document, tokenized_documents_list):
 	""" Term Frequency - Inverse Document Frequency : returns tf * idf """
-	logger.info('Calculating TF-IDF')
+	logger.debug('Calculating TF-IDF')
 
 	#return term_fequency(term, tokenized_document) * inverse_document_frequency(term, tokenized_documents_list)
 	#return augmented_term_fequency(term, tokenized_document) * inverse_document_frequency(term, tokenized_documents_list)
@@ -184,7 +154,7 @@ def tf_idf(term, tokenized_document, tokenized_documents_list):
 #
 
 def keyword_score(term, tokenized_document, tokenized_documents_list):
-	logger.info('Calculating Keyword Score')
+	logger.debug('Calculating Keyword Score')
 
 	tf_idf_scaler = 2
 	term_tf_idf_score = tf_idf(term,tokenized_document,tokenized_documents_list)
@@ -192,10 +162,36 @@ def keyword_score(term, tokenized_document, tokenized_documents_list):
 	return tf_idf_scaler*term_tf_idf_score + term_similarity_score
 
 
-def keyword_scores_for_part_of_speech(pos, tokenized_document, tokenized_documents_list):
-	logger.info('Calculating Keyword Score For Part Of Speech')
+def corpus_keyword_scores(tokenized_documents_list):
+	""" Returns list per document of (term, keyword score) sorted by score, tf-idf is computed for the whole corpus at once """
+	logger.info('Calculating Corpus Keyword Scores')
 
-	tagged_tokenized_document = pos_tag(tokenized_document)
+	tf_idf_scaler = 2
+	with inst.stage('score'):
+		tf_idf_matrix = TfIdfMatrix(tokenized_documents_list)
+		tf_idf_scores = tf_idf_matrix.tf_idf()
+
+	all_document_keyword_scores = []
+	for i, d in enumerate(tokenized_documents_list):
+		document_tf_idf_scores = tf_idf_matrix.document_scores(i, tf_idf_scores)
+		document_similarity_scores = wordnet_cache.similarity_scores(document_tf_idf_scores.keys(), d)
+		document_keyword_scores = []
+		for t, term_tf_idf_score in document_tf_idf_scores.items():
+			document_keyword_scores.append((t, tf_idf_scaler*term_tf_idf_score + document_similarity_scores[t]))
+		document_keyword_scores.sort(key=lambda x: x[1])
+		all_document_keyword_scores.append(document_keyword_scores)
+
+	return all_document_keyword_scores
+
+
+def keyword_scores_for_part_of_speech(pos, tokenized_document, tokenized_documents_list, tags=None):
+	""" returns tokens of document tagged pos, tags are the document tags stored by pos_tagging.tag_corpus, tagged here when None """
+	logger.debug('Calculating Keyword Score For Part Of Speech')
+
+	if tags is None:
+		tagged_tokenized_document = text_cache.pos_tags(tokenized_document)
+	else:
+		tagged_tokenized_document = zip(tokenized_document, tags)
 	filtered_tokens = [term for term, tag in tagged_tokenized_document if tag == pos]
 	return list(filtered_tokens)
 
@@ -208,30 +204,27 @@ def keyword_scores_for_part_of_speech(pos, tokenized_document, tokenized_documen
 #
 
 
-#
-#			Load Data Set
-#
+def main():
+	#
+	#			Load Data Set
+	#
 
-data_set_path = 'data_set/'
-subreddit = 'worldnews'
+	data_set_path = 'data_set/'
+	subreddit = 'worldnews'
 
-all_documents = load_scraped_subreddit_document_set(data_set_path, subreddit)
-tokenized_documents_list = list(map(processes_and_tokenize, all_documents))
+	all_documents = load_scraped_subreddit_document_set(data_set_path, subreddit)
+	tokenized_documents_list = list(map(processes_and_tokenize, all_documents))
 
-#
-#			Testing Score Methods
-#
+	#
+	#			Testing Score Methods
+	#
+
+	all_document_keyword_scores = corpus_keyword_scores(tokenized_documents_list)
+
+	for d in all_document_keyword_scores:
+		print ("\n\n\n")
+		for i in d:
+			print ("term: %s,\t\t keyword_score: %f" % (i[0], i[1]))
 
-all_document_keyword_scores = []
-for d in tokenized_documents_list:
-	document_keyword_scores = []
-	for t in d:
-		#print ("word: %s,\t tf: %f,\t idf: %f,\t tf-idf: %f,\t similarity_score: %f" % (t, term_fequency(t,d), inverse_document_frequency(t,tokenized_documents_list), tf_idf(t,d,tokenized_documents_list), similarity_score(t,d)))
-		document_keyword_scores.append((t,keyword_score(t,d,tokenized_documents_list)))
-	document_keyword_scores.sort(key=lambda x: x[1])
-	all_document_keyword_scores.append(document_keyword_scores)
-
-for d in all_document_keyword_scores:
-	print ("\n\n\n")
-	for i in d:
-		print ("term: %s,\t\t keyword_score: %f" % (i[0], i[1]))
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,47 @@
+#python 3
+
+"""
+	sentence scoring cost per token stays flat as documents grow
+
+		python -m pytest tests/
+"""
+
+#internal
+import os
+import sys
+import time
+
+#external
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+nltk = pytest.importorskip('nltk')
+
+#mylibs
+import keywords as key
+
+repeats = (2, 4, 8, 16)
+tolerance = 3.0		# largest allowed ratio of seconds per token between any two sizes
+
+def seconds_per_token(document, runs=3):
+	""" best of runs seconds per token of sentence scoring on document, tokenized with the regex backend """
+	best = None
+	for _ in range(runs):
+		start = time.perf_counter()
+		analysis = key.DocumentAnalysis(document, tokenizer='regex')
+		analysis.sentence_scores
+		elapsed = time.perf_counter() - start
+		num_tokens = sum(len(words) for words in analysis.sentence_words)
+		best = elapsed / num_tokens if best is None else min(best, elapsed / num_tokens)
+	return best
+
+def test_sentence_scoring_scales_linearly():
+	try:
+		nltk.data.find('corpora/stopwords')
+	except LookupError:
+		pytest.skip('nltk stopwords data not installed')
+
+	seconds_per_token(key.text, runs=1)		# warm up stop words and stemmer
+	per_token = [seconds_per_token('\n\n'.join([key.text] * k)) for k in repeats]
+	assert max(per_token) / min(per_token) < tolerance, per_token
@@ -0,0 +1,138 @@
+#python 3
+
+"""
+	scraper against a local stub of the reddit listing and article hosts
+
+		python -m pytest tests/
+"""
+
+#internal
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+#external
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip('requests')
+pytest.importorskip('newspaper')
+
+#mylibs
+import reddit_scraper
+
+article_html = '<html><head><title>%s</title></head><body><article><p>%s</p></article></body></html>'
+paragraph = 'Troops crossed the northern border on Monday after talks between the two governments broke down late on Sunday night. '
+
+class StubHandler(BaseHTTPRequestHandler):
+	""" /r/worldnews.json serves two listing pages, /article/<name> serves articles, see server.stub """
+
+	def log_message(self, format, *args):
+		pass
+
+	def send(self, status, body, content_type='text/html'):
+		body = body.encode('utf-8')
+		self.send_response(status)
+		self.send_header('Content-Type', content_type)
+		self.send_header('Content-Length', str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def do_GET(self):
+		stub = self.server.stub
+		url = urlparse(self.path)
+		with stub['lock']:
+			stub['requests'].append(url.path)
+
+		if url.path == '/r/worldnews.json':
+			after = parse_qs(url.query).get('after', [None])[0]
+			self.send(200, json.dumps(stub['pages'][after]), 'application/json')
+			return
+
+		name = url.path.rsplit('/', 1)[-1]
+		with stub['lock']:
+			stub['in_flight'] += 1
+			stub['max_in_flight'] = max(stub['max_in_flight'], stub['in_flight'])
+			calls = stub['requests'].count(url.path)
+		time.sleep(0.05)
+		# leave before responding, the client starts its next request as soon as the response arrives
+		with stub['lock']:
+			stub['in_flight'] -= 1
+
+		if name == 'missing':
+			self.send(404, 'not found')
+		elif name == 'flaky' and calls == 1:
+			self.send(503, 'unavailable')
+		else:
+			self.send(200, article_html % (name, paragraph * 3))
+
+@pytest.fixture
+def stub():
+	server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+	base_url = 'http://127.0.0.1:%d' % server.server_address[1]
+
+	def post(name):
+		return {'kind': 't3', 'data': {'title': name, 'url': '%s/article/%s' % (base_url, name)}}
+
+	server.stub = {
+		'base_url': base_url,
+		'lock': threading.Lock(),
+		'requests': [],
+		'in_flight': 0,
+		'max_in_flight': 0,
+		'pages': {
+			None: {'data': {'children': [post('one'), post('two'), post('flaky')], 'after': 't3_page2'}},
+			't3_page2': {'data': {'children': [post('three'), post('four'), post('missing')], 'after': None}}
+		}
+	}
+	thread = threading.Thread(target=server.serve_forever, daemon=True)
+	thread.start()
+	yield server.stub
+	server.shutdown()
+	server.server_close()
+
+def scrape(stub, directory, **kwargs):
+	options = dict(pages=3, max_workers=4, max_per_host=2, min_interval=0, retries=2, base_url=stub['base_url'])
+	options.update(kwargs)
+	return reddit_scraper.save_subreddit_to_dir('worldnews', str(directory) + os.sep, **options)
+
+def test_pagination_retry_and_missing_post(stub, tmp_path, caplog):
+	with caplog.at_level(logging.WARNING, logger='reddit_scraper'):
+		report = scrape(stub, tmp_path)
+
+	assert stub['requests'].count('/r/worldnews.json') == 2
+	assert sorted(urlparse(url).path for url in report['added']) == ['/article/flaky', '/article/four', '/article/one', '/article/three', '/article/two']
+	assert stub['requests'].count('/article/flaky') == 2
+	assert [urlparse(url).path for url in report['failed']] == ['/article/missing']
+	assert 'article/missing' in caplog.text
+
+	saved = sorted(f for f in os.listdir(str(tmp_path)) if f.startswith('worldnews_'))
+	assert saved == ['worldnews_flaky.txt', 'worldnews_four.txt', 'worldnews_one.txt', 'worldnews_three.txt', 'worldnews_two.txt']
+
+def test_max_per_host(stub, tmp_path):
+	scrape(stub, tmp_path, max_workers=6, max_per_host=1)
+	assert stub['max_in_flight'] == 1
+
+def test_concurrent_downloads(stub, tmp_path):
+	scrape(stub, tmp_path, max_workers=6, max_per_host=3)
+	assert 1 < stub['max_in_flight'] <= 3
+
+def test_second_run_skips_saved_posts(stub, tmp_path):
+	scrape(stub, tmp_path)
+	report = scrape(stub, tmp_path)
+	assert len(report['added']) == 0
+	assert len(report['skipped']) == 5
+
+def test_duplicate_url_saved_once(stub, tmp_path):
+	first_page = stub['pages'][None]['data']['children']
+	first_page.insert(1, first_page[0])		# downloaded at the same time without deduplication
+	report = scrape(stub, tmp_path)
+	assert stub['requests'].count('/article/one') == 1
+	assert len(report['added']) == 5
+	assert len([f for f in os.listdir(str(tmp_path)) if f.startswith('worldnews_one')]) == 1
@@ -0,0 +1,93 @@
+#python 3
+
+"""
+	server endpoints against a live server on a free port
+
+		python -m pytest tests/
+"""
+
+#internal
+import os
+import sys
+import json
+import threading
+import urllib.error
+import urllib.request
+
+#external
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+nltk = pytest.importorskip('nltk')
+
+#mylibs
+import server
+
+text = 'Troops crossed the northern border on Monday. Markets fell sharply in early trading. The talks resume next week in Geneva.'
+
+@pytest.fixture(scope='module')
+def url():
+	try:
+		nltk.data.find('corpora/stopwords')
+	except LookupError:
+		pytest.skip('nltk stopwords data not installed')
+
+	srv = server.new_server(port=0, workers=1, tokenizer_backend='regex')
+	thread = threading.Thread(target=srv.serve_forever, daemon=True)
+	thread.start()
+	yield 'http://127.0.0.1:%d/' % srv.server_address[1]
+	srv.shutdown()
+	srv.server_close()
+	srv.executor.shutdown(wait=True)
+
+def post(url, path, body):
+	""" returns (status, decoded json response) of POST of body, a string sent as is or an object sent as json """
+	data = body if isinstance(body, str) else json.dumps(body)
+	request = urllib.request.Request(url + path, data=data.encode('utf-8'), headers={'Content-Type': 'application/json'})
+	try:
+		with urllib.request.urlopen(request) as response:
+			return response.status, json.loads(response.read())
+	except urllib.error.HTTPError as e:
+		return e.code, json.loads(e.read())
+
+def test_task(url):
+	status, response = post(url, 'rake', {'documents': [text, text], 'n': 2})
+	assert status == 200
+	assert len(response['results']) == 2
+	assert response['results'][0] == response['results'][1]
+	assert len(response['results'][0]) <= 2
+
+def test_batch(url):
+	tasks = [{'task': 'top_words', 'text': text, 'n': 3}, {'task': 'summary', 'text': text, 'percentage': 0.5}]
+	status, response = post(url, 'batch', {'tasks': tasks})
+	assert status == 200
+	assert len(response['results']) == 2
+	assert len(response['results'][0]) <= 3
+	assert isinstance(response['results'][1], str)
+
+@pytest.mark.parametrize('path, body', [
+	('rake', '{"documents": ['),
+	('rake', [1, 2]),
+	('rake', {'documents': 'abc'}),
+	('batch', {'tasks': [{'text': text}]}),
+	('batch', {'tasks': [{'task': 'rake'}]})
+])
+def test_bad_body(url, path, body):
+	status, response = post(url, path, body)
+	assert status == 400
+	assert response['error'].startswith('bad request')
+
+@pytest.mark.parametrize('path, body', [
+	('top_words', {'documents': [text], 'n': 'x'}),
+	('top_phrases', {'documents': [text], 'n': -1}),
+	('summary', {'documents': [text], 'percentage': 'abc'}),
+	('summary', {'documents': [text], 'percentage': 2}),
+	('batch', {'tasks': [{'task': 'top_words', 'text': text, 'return_scores': 'yes'}]})
+])
+def test_bad_option(url, path, body):
+	status, response = post(url, path, body)
+	assert status == 400
+
+def test_unknown_path(url):
+	assert post(url, 'nope', '{"malformed')[0] == 404
@@ -0,0 +1,57 @@
+#python 3
+
+"""
+	regex tokenizer backend against nltk on a fixed corpus
+
+		python -m pytest tests/
+"""
+
+#internal
+import os
+import sys
+
+#external
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+#mylibs
+import tokenizers
+
+nltk = pytest.importorskip('nltk')
+
+# sentences with contractions, quotes, numbers, abbreviations and trailing punctuation
+sentences = [
+	'The U.S. and the U.K. said on Monday that Mr. Smith, 54, would not run again.',
+	'He didn\'t say why.',
+	'"We can\'t accept this," the minister told reporters.',
+	'"It\'s a question of trust."',
+	'Prices rose 3.5% to $1,200 in Jan. after a 10:30 a.m. announcement -- the highest since 2008.',
+	'AT&T (the company) cannot confirm the deal...',
+	'Officials declined to comment!',
+	'Is this the end?',
+	'Analysts say no; others aren\'t so sure: "wait and see."',
+	'Dr. O\'Neil\'s well-known report, published by Reuters Inc. in Washington, D.C., was cited.',
+	'Gen. Mark Milley\'s comments came after the U.N. vote, which passed 128-9 with 35 abstentions.',
+	'They\'re gonna need more time, she\'d said, and we\'ll see what they\'ve got.'
+]
+
+# texts whose sentence boundaries do not depend on abbreviation knowledge
+texts = [
+	'"We can\'t accept this," the minister told reporters. "It\'s a question of trust."',
+	'Is this the end? Analysts say no; others aren\'t so sure. Officials declined to comment!',
+	'Troops crossed the northern border on Monday. Markets fell 3.5% in early trading. The talks resume next week.'
+]
+
+@pytest.mark.parametrize('sentence', sentences)
+def test_regex_words_match_nltk(sentence):
+	""" treebank word tokenization needs no nltk data, preserve_line skips punkt """
+	assert tokenizers.get('regex').words(sentence) == nltk.word_tokenize(sentence, preserve_line=True)
+
+@pytest.mark.parametrize('text', texts)
+def test_regex_sentences_match_nltk(text):
+	try:
+		expected = nltk.sent_tokenize(text)
+	except LookupError:
+		pytest.skip('nltk punkt data not installed')
+	assert tokenizers.get('regex').sentences(text) == expected
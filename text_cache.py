@@ -0,0 +1,184 @@
+#python 3
+
+"""
+	Content addressed cache of sentence splitting, word tokenization and pos tags
+
+	entries are keyed by sha256 of (cache version, kind, tokenizer configuration, text),
+	so a changed article or a changed tokenizer never reads a stale entry.
+	tokenization is keyed by tokenizer backend name, see tokenizers.
+
+	tiers:
+		memory	- least recently used table of max_memory_entries entries, per process
+		disk	- one json file per entry under cache_dir, shared by processes and runs.
+				  enabled by set_cache_dir(path) or the environment variable NLP_CACHE_DIR
+
+	a rerun over an unchanged corpus with a disk tier reads every tokenization
+	from disk and never runs the nltk tokenizers and tagger.
+	returned lists are shared with the cache and must not be modified.
+"""
+
+#internal
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict, Counter
+
+#mylibs
+import tokenizers
+
+#external (imported on first use)
+from lazy_imports import lazy_module
+nltk = lazy_module('nltk')
+
+# logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+#
+#	Settings
+#
+
+version = 1						# bump when cached output of a kind changes
+max_memory_entries = 10000
+cache_dir = os.environ.get('NLP_CACHE_DIR') or None
+
+pos_tagger = 'nltk.pos_tag'
+
+_memory = OrderedDict()		# key -> value, least recently used first
+_stats = Counter()			# memory_hits, disk_hits, misses
+_lock = threading.Lock()
+
+def set_cache_dir(path):
+	""" enable disk tier in directory path, None disables it """
+	global cache_dir
+	cache_dir = path
+
+#
+#	Cache Methods
+#
+
+def cache_key(kind, config, text):
+	""" returns sha256 hex digest of cache version, kind, configuration and text """
+	h = hashlib.sha256()
+	h.update(('%d\x00%s\x00%s\x00' % (version, kind, config)).encode('utf-8'))
+	h.update(text.encode('utf-8'))
+	return h.hexdigest()
+
+def _disk_path(key):
+	return os.path.join(cache_dir, key[:2], key + '.json')
+
+def _read_disk(key):
+	try:
+		with open(_disk_path(key)) as data_file:
+			return json.load(data_file)
+	except (OSError, ValueError):
+		return None
+
+def _write_disk(key, value):
+	""" write entry through a temporary file so concurrent readers never see a partial entry """
+	path = _disk_path(key)
+	try:
+		os.makedirs(os.path.dirname(path), exist_ok=True)
+		fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+		with os.fdopen(fd, 'w') as outfile:
+			json.dump(value, outfile)
+		os.replace(tmp_path, path)
+	except OSError as e:
+		logger.warning('Text cache write failed: %s' % e)
+
+def _remember(key, value):
+	with _lock:
+		_memory[key] = value
+		_memory.move_to_end(key)
+		while len(_memory) > max_memory_entries:
+			_memory.popitem(last=False)
+
+def lookup(kind, config, text):
+	""" Returns cached value for kind, configuration and text from memory, then disk, None when not cached """
+	key = cache_key(kind, config, text)
+
+	with _lock:
+		try:
+			value = _memory[key]
+			_memory.move_to_end(key)
+			_stats['memory_hits'] += 1
+			return value
+		except KeyError:
+			pass
+
+	if cache_dir is not None:
+		value = _read_disk(key)
+		if value is not None:
+			_stats['disk_hits'] += 1
+			_remember(key, value)
+			return value
+
+	_stats['misses'] += 1
+	return None
+
+def store(kind, config, text, value):
+	""" Store json serializable value for kind, configuration and text in memory and disk tiers """
+	key = cache_key(kind, config, text)
+	_remember(key, value)
+	if cache_dir is not None:
+		_write_disk(key, value)
+
+def cached(kind, config, text, compute):
+	""" Returns compute(text) for kind and configuration, from memory, then disk, then computed and stored in both.
+	values must be json serializable """
+	value = lookup(kind, config, text)
+	if value is None:
+		value = compute(text)
+		store(kind, config, text, value)
+	return value
+
+def cache_info():
+	return dict(_stats, memory_entries=len(_memory), cache_dir=cache_dir)
+
+def clear(disk=False):
+	""" clear memory tier and statistics, and every disk entry when disk is True """
+	with _lock:
+		_memory.clear()
+		_stats.clear()
+	if disk and cache_dir is not None and os.path.isdir(cache_dir):
+		for sub_dir in os.listdir(cache_dir):
+			sub_path = os.path.join(cache_dir, sub_dir)
+			if len(sub_dir) == 2 and os.path.isdir(sub_path):
+				for f in os.listdir(sub_path):
+					if f.endswith('.json'):
+						os.remove(os.path.join(sub_path, f))
+
+#
+#	Tokenization Methods
+#
+
+def sentences(text, tokenizer=None):
+	""" Returns list of sentences of text, tokenizer is a backend name or instance, see tokenizers.get """
+	tokenizer = tokenizers.get(tokenizer)
+	return cached('sentences', tokenizer.name, text, tokenizer.sentences)
+
+def tokenize(text, lower_words=False, tokenizer=None):
+	""" Returns [sentences, sentence word lists] for text, words are tokenized from lower cased sentences when lower_words is True """
+	tokenizer = tokenizers.get(tokenizer)
+
+	def compute(text):
+		text_sentences = sentences(text, tokenizer)
+		if lower_words:
+			return [text_sentences, [tokenizer.words(s.lower()) for s in text_sentences]]
+		return [text_sentences, [tokenizer.words(s) for s in text_sentences]]
+
+	config = '%s,lower=%s' % (tokenizer.name, lower_words)
+	return cached('tokenize', config, text, compute)
+
+def pos_key(tokens):
+	""" text the tags of token list are cached under """
+	return '\x1f'.join(tokens)
+
+def pos_tags(tokens):
+	""" Returns list of (token, tag) for token list, only the tags are cached """
+	tokens = list(tokens)
+	tags = cached('pos', pos_tagger, pos_key(tokens), lambda text: [tag for token, tag in nltk.pos_tag(tokens)])
+	return list(zip(tokens, tags))
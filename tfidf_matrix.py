@@ -0,0 +1,122 @@
+#python 3
+
+"""
+	Sparse TF-IDF matrix
+
+	builds a sparse document x term count matrix once for the whole corpus and
+	computes term frequency (plain and augmented), inverse document frequency
+	(log and no-log) and tf-idf for every term in every document in vectorized
+	form.
+
+	requirements:
+		-numpy
+		-scipy
+"""
+
+#internal
+import logging
+from collections import Counter
+
+#external (imported on first use)
+from lazy_imports import lazy_module
+np = lazy_module('numpy')
+sparse = lazy_module('scipy.sparse')
+
+# logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TfIdfMatrix:
+	""" document x term count matrix over tokenized documents """
+
+	def __init__(self, tokenized_documents_list, vocabulary=None):
+		logger.info('Building Document Term Matrix')
+
+		if vocabulary is None:
+			vocabulary = sorted(set(t for d in tokenized_documents_list for t in d))
+		self.terms = list(vocabulary)
+		self.vocabulary = {t:i for i, t in enumerate(self.terms)}
+
+		rows, cols, data = [], [], []
+		document_lengths = []
+		for row, tokenized_document in enumerate(tokenized_documents_list):
+			counts = Counter(t for t in tokenized_document if t in self.vocabulary)
+			rows += [row] * len(counts)
+			cols += [self.vocabulary[t] for t in counts]
+			data += list(counts.values())
+			document_lengths.append(len(tokenized_document))
+
+		shape = (len(document_lengths), len(self.terms))
+		self.counts = sparse.csr_matrix((data, (rows, cols)), shape=shape, dtype=np.float64)
+		self.document_lengths = np.array(document_lengths, dtype=np.float64)
+
+		logger.info('Document Term Matrix Complete: %d documents, %d terms' % shape)
+
+	@property
+	def num_documents(self):
+		return self.counts.shape[0]
+
+	#
+	#	Term Frequency Methods
+	#
+
+	def term_frequency(self):
+		""" Return sparse matrix of term count / number of terms in document """
+		lengths = np.where(self.document_lengths > 0, self.document_lengths, 1)
+		return sparse.diags(1 / lengths) @ self.counts
+
+	def augmented_term_frequency(self):
+		""" Return sparse matrix of term count / maximum term count in document """
+		max_counts = self.counts.max(axis=1).toarray().ravel()
+		max_counts = np.where(max_counts > 0, max_counts, 1)
+		return sparse.diags(1 / max_counts) @ self.counts
+
+	#
+	#	Inverse Document Frequency Methods
+	#
+
+	def document_frequency(self):
+		""" Return array of number of documents containing each term """
+		return np.asarray((self.counts > 0).sum(axis=0)).ravel()
+
+	def nolog_inverse_document_frequency(self):
+		""" IDF(t) = Number Of Documents / Number Of Documents Containg Term """
+		document_frequency = self.document_frequency()
+		document_frequency = np.where(document_frequency > 0, document_frequency, 1)
+		return self.num_documents / document_frequency
+
+	def inverse_document_frequency(self):
+		""" IDF(t) = ln( Number Of Documents / Number Of Documents Containg Term )."""
+		return np.log(self.nolog_inverse_document_frequency())
+
+	#
+	#	TF-IDF Methods
+	#
+
+	def tf_idf(self, augmented=False, log=False):
+		""" Return sparse matrix of tf * idf, defaults match tf_idf in normalizers and summary (plain tf, no-log idf) """
+		tf = self.augmented_term_frequency() if augmented else self.term_frequency()
+		idf = self.inverse_document_frequency() if log else self.nolog_inverse_document_frequency()
+		return sparse.csr_matrix(tf @ sparse.diags(idf))
+
+	def document_scores(self, document_index, scores=None):
+		""" Return dictionary term -> score for terms in document, scores defaults to tf_idf() """
+		if scores is None:
+			scores = self.tf_idf()
+		row = scores.getrow(document_index)
+		return {self.terms[col]: value for col, value in zip(row.indices, row.data)}
+
+	def ranked_keywords(self, n=None, scores=None):
+		""" Return list per document of (term, score) sorted by descending score, top n if given """
+		if scores is None:
+			scores = self.tf_idf()
+
+		ranked = []
+		for row in range(self.num_documents):
+			start, end = scores.indptr[row], scores.indptr[row+1]
+			cols, values = scores.indices[start:end], scores.data[start:end]
+			order = np.argsort(-values, kind='stable')
+			if n is not None:
+				order = order[:n]
+			ranked.append([(self.terms[cols[i]], float(values[i])) for i in order])
+		return ranked
@@ -0,0 +1,150 @@
+#python 3
+
+"""
+	Sentence and word tokenizer backends
+
+	every backend has the same interface
+
+		tokenizer = tokenizers.get('regex')
+		tokenizer.sentences(text)	- list of sentences
+		tokenizer.words(sentence)	- list of word and punctuation tokens
+
+	backends:
+		nltk	- nltk.sent_tokenize (punkt) and nltk.word_tokenize (treebank regex cascade)
+		regex	- precompiled single pass expressions following the punkt and treebank
+				  conventions: contractions split off ("do", "n't"), double quotes as `` and '',
+				  numbers like 1,000 and 3.5 kept whole, a sentence final period split off and
+				  abbreviations like "mr." and "u.s." kept whole. it agrees with nltk on most
+				  news text at a fraction of the cost, see python benchmarks.py tokenizers
+
+	pipelines choose a backend by name with their tokenizer_backend setting.
+	word_chars(text) is the \\w+ tokenizer normalizers uses, compiled once.
+"""
+
+#internal
+import re
+import logging
+
+#external (imported on first use)
+from lazy_imports import lazy_module
+nltk = lazy_module('nltk')
+
+# logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+#
+#	Word Character Tokenizer
+#
+
+_word_chars = re.compile(r'\w+')
+
+def word_chars(text):
+	""" Returns list of \\w+ runs in text, same tokens as nltk RegexpTokenizer(r'\\w+') """
+	return _word_chars.findall(text)
+
+#
+#	Backends
+#
+
+class NltkTokenizer:
+	""" punkt sentence splitting and treebank word tokenization """
+	name = 'nltk'
+
+	def sentences(self, text):
+		return nltk.sent_tokenize(text)
+
+	def words(self, sentence):
+		return nltk.word_tokenize(sentence)
+
+# words followed by a period that do not end a sentence, lower case without the period
+abbreviations = frozenset([
+	'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'st', 'mt', 'ft', 'gen', 'gov', 'sen', 'rep', 'rev',
+	'lt', 'col', 'sgt', 'capt', 'cmdr', 'adm', 'pres', 'vs', 'etc', 'inc', 'ltd', 'co', 'corp', 'no',
+	'jan', 'feb', 'mar', 'apr', 'jun', 'jul', 'aug', 'sep', 'sept', 'oct', 'nov', 'dec',
+	'u.s', 'u.k', 'u.n', 'e.g', 'i.e', 'a.m', 'p.m'
+])
+
+_sentence_break = re.compile(r"""
+	(?P<end>\.\.\.|[.!?]+)		# sentence final punctuation
+	["')\]]*					# closing quotes and brackets stay with the sentence
+	\s+
+	(?=\S)
+""", re.X)
+
+_last_word = re.compile(r"[\"'(\[]*(\S*?)\.*$")
+
+_word_token = re.compile(r"""
+	(?P<open_quote>^"|(?<=[\s(\[{<])")
+	|(?P<close_quote>")
+	|(?P<word>
+		(?:
+			[A-Za-z](?:\.[A-Za-z])+									# abbreviations u.s.
+			|\d+(?:[.,:/]\d+)+										# numbers 1,000 3.5 10:30
+			|(?:can(?=not\b)|gon(?=na\b)|got(?=ta\b)|wan(?=na\b)|gim(?=me\b)|lem(?=me\b))
+			|\w+(?=n't\b)|n't\b										# do n't
+			|\w+(?='(?:s|m|d|ll|re|ve)\b)|'(?:s|m|d|ll|re|ve)\b		# it 's
+			|\w+(?:-\w+|'(?!(?:s|m|d|ll|re|ve|t)\b)\w+)*
+		)
+		(?:\.(?!\.)(?![\])}>"']*\s*$))?								# period kept unless sentence final or ellipsis
+		|\.\.\.|--|''|``
+		|\S
+	)
+""", re.X | re.I)
+
+class RegexTokenizer:
+	""" single pass regular expression sentence splitting and treebank style word tokenization """
+	name = 'regex'
+
+	def sentences(self, text):
+		sentences = []
+		start = 0
+		for match in _sentence_break.finditer(text):
+			if match.group('end') == '.' or match.group('end') == '...':
+				preceding = text[start:match.start('end')].rsplit(None, 1)
+				word = _last_word.match(preceding[-1]).group(1).lower() if len(preceding) > 0 else ''
+				if word in abbreviations or len(word) == 1:
+					continue
+				if match.group('end') == '...' and not text[match.end()].isupper():
+					continue
+			sentences.append(text[start:match.end()].strip())
+			start = match.end()
+
+		last = text[start:].strip()
+		if len(last) > 0:
+			sentences.append(last)
+		return sentences
+
+	def words(self, sentence):
+		tokens = []
+		for match in _word_token.finditer(sentence):
+			kind = match.lastgroup
+			if kind == 'open_quote':
+				tokens.append('``')
+			elif kind == 'close_quote':
+				tokens.append("''")
+			else:
+				tokens.append(match.group())
+		return tokens
+
+#
+#	Registry
+#
+
+backends = {
+	'nltk': NltkTokenizer(),
+	'regex': RegexTokenizer()
+}
+
+default_backend = 'nltk'
+
+def get(name=None):
+	""" Returns tokenizer backend by name, default_backend when name is None, a backend instance is returned as is """
+	if name is None:
+		name = default_backend
+	if not isinstance(name, str):
+		return name
+	try:
+		return backends[name]
+	except KeyError:
+		raise ValueError('unknown tokenizer backend: %s, choose from %s' % (name, ', '.join(sorted(backends))))
@@ -0,0 +1,133 @@
+#python 3
+
+"""
+	WordNet synset and Wu-Palmer similarity cache
+
+	each vocabulary word is resolved to its first wordnet synset once,
+	pairwise Wu-Palmer scores are kept in a bounded least recently used table.
+"""
+
+#internal
+import logging
+from collections import OrderedDict, Counter
+
+#mylibs
+import instrumentation as inst
+
+#external (imported on first use)
+from lazy_imports import lazy_module
+nltk = lazy_module('nltk')
+
+# logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+#
+#	Settings
+#
+
+max_pair_table_size = 500000
+
+_synset_table = {}				# word -> synset name or None
+_synsets = {}					# synset name -> synset
+_pair_table = OrderedDict()		# (synset name, synset name) -> wup similarity, least recently used first
+
+#
+#	Synset Methods
+#
+
+def synset_name(term):
+	""" Returns name of first wordnet synset of term, None if term has no synset """
+	try:
+		return _synset_table[term]
+	except KeyError:
+		pass
+
+	try:
+		syns = nltk.corpus.wordnet.synsets(term)
+		name = syns[0].name()
+		_synsets[name] = nltk.corpus.wordnet.synset(name)
+	except:
+		name = None
+
+	_synset_table[term] = name
+	return name
+
+def syns_tag(term):
+	""" returns word wordnet.synset """
+	name = synset_name(term)
+	if name is None:
+		return None
+	return _synsets[name]
+
+#
+#	Similarity Methods
+#
+
+def wup_similarity(name_a, name_b):
+	""" Returns Wu-Palmer similarity of two synset names, None if not comparable """
+	key = (name_a, name_b)
+	try:
+		ss = _pair_table[key]
+		_pair_table.move_to_end(key)
+		return ss
+	except KeyError:
+		pass
+
+	try:
+		ss = _synsets[name_a].wup_similarity(_synsets[name_b])
+	except:
+		ss = None
+
+	_pair_table[key] = ss
+	while len(_pair_table) > max_pair_table_size:
+		_pair_table.popitem(last=False)
+	return ss
+
+def synset_multiset(tokenized_document):
+	""" Returns Counter of synset names for document tokens, tokens without synset are counted under None """
+	return Counter(synset_name(t) for t in tokenized_document)
+
+def similarity_scores(terms, tokenized_document, minimum_score=.7):
+	""" Returns dictionary term -> similarity score against all words in document.
+	score = sum of wup similarities above minimum_score / number of document tokens """
+	with inst.stage('similarity'):
+		return _similarity_scores(terms, tokenized_document, minimum_score)
+
+def _similarity_scores(terms, tokenized_document, minimum_score):
+	document_synsets = synset_multiset(tokenized_document)
+	num_tokens = sum(document_synsets.values())
+
+	scores = {}
+	for term in terms:
+		if term in scores:
+			continue
+
+		main_name = synset_name(term)
+		if main_name is None:
+			scores[term] = 0
+			continue
+
+		assert num_tokens > 0
+		summed_similarity_scores = 0
+		for name, count in document_synsets.items():
+			if name is None:
+				continue
+			ss = wup_similarity(main_name, name)
+			if ss is not None and ss > minimum_score:
+				summed_similarity_scores += count * ss
+		scores[term] = summed_similarity_scores / num_tokens
+
+	return scores
+
+#
+#	Cache Methods
+#
+
+def cache_info():
+	return {'synsets': len(_synset_table), 'pairs': len(_pair_table)}
+
+def clear():
+	_synset_table.clear()
+	_synsets.clear()
+	_pair_table.clear()